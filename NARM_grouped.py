@@ -1,77 +1,79 @@
 import numpy as np
-import pandas as pd
-import json
 
-from niaarm import Dataset
-
-from algos.de import DifferentialEvolution
-from algos.hho import HarrisHawksOptimization
-from algos.gwo import GreyWolfOptimizer
-from algos.bat import BatAlgorithm
-from algos.sca import SineCosineAlgorithm
+from algos import get_algorithm_class
 
 from utils.Mine import get_rules
+from utils.Loader import Dataset, load_dataset, load_groups
+from utils.Preprocess import prune_columns, reattach_features
+from utils.Seeds import run_streams
+
+METRICS = ("support", "confidence")
+
+# Datasets whose groups main subsamples, all groups of the others are mined
+SUBSAMPLED_DATASETS = ("leakdb",)
 
+# Parameters that differ from the algorithm defaults
+ALGORITHM_PARAMETERS = {
+    "DE": {"population_size": 50, "differential_weight": 0.5, "crossover_probability": 0.9},
+}
 
-def subsample(data, group_info, percentage):
+
+def select_groups(group_info, percentage, rng=None):
     total_groups = len(group_info)
     n = int(total_groups * percentage)
 
-    selected_groups = np.random.choice(group_info, n, replace=False)
-
-    # Extract the relevant features for the selected groups
-    selected_features = []
-    seen_features = set()
-    for group in selected_groups:
-        for feature in group.keys():
-            if feature not in seen_features:
-                selected_features.append(feature)
-                seen_features.add(feature)
+    # the global random state is only used when no generator is given
+    if rng is None:
+        return np.random.choice(group_info, n, replace=False)
+    return rng.choice(group_info, n, replace=False)
 
-    # Filter the DataFrame to include only the selected features using .loc
-    # Maintain the original order of columns
-    filtered_df = data.loc[:, [col for col in data.columns if col in selected_features]]
 
-    return filtered_df, selected_groups
+def make_algorithm(algo_name, grouped, repair_groups=False, params=None, seed=None):
+    algo_class = get_algorithm_class(algo_name)
+    # explicitly given parameters override the defaults of ALGORITHM_PARAMETERS
+    params = {**ALGORITHM_PARAMETERS.get(algo_name, {}), **(params or {})}
+    return algo_class(grouping=grouped, repair_groups=repair_groups, seed=seed, **params)
 
 
-def main(grouped, evaluations, algo_name, dataset_name, subsampling_factor=0.15):
-    df = pd.read_csv(f'/datasets/water pipes/{dataset_name}.csv')
-    with open(f"/datasets/water pipes/{dataset_name}_groups.json", "r") as f:
-        group_info = json.load(f)
+def main(grouped, evaluations, algo_name, dataset_name, subsampling_factor=0.15, prune=False,
+         encoding="feature", repair_groups=False, params=None, memory_limit=None, seed=None,
+         monitor=None):
+    group_info = load_groups(dataset_name)
+    # separate streams for the group selection, the algorithm and the problem, see utils.Seeds
+    streams = run_streams(seed)
 
-    if dataset_name == "leakdb":
-        grouped_data, grouping_data = subsample(df, group_info, subsampling_factor)
-        data = Dataset(grouped_data)
+    if dataset_name == "leakdb" and subsampling_factor is None:
+        # Mine the full width, best with a memory_limit
+        grouping_data = group_info
+        df = load_dataset(dataset_name)
+    elif dataset_name == "leakdb":
+        # Select the groups first, so only their columns are decoded from disk
+        grouping_data = select_groups(group_info, subsampling_factor, np.random.default_rng(streams.subsample))
+        df = load_dataset(dataset_name, grouping_data)
     elif dataset_name == "lbnl_fdd":
-        data = Dataset(df)
+        df = load_dataset(dataset_name)
         grouping_data = group_info
     else:
         raise ValueError("Invalid dataset name")
 
-    metrics = ("support", "confidence")
-
-    if algo_name == "DE":
-        algo = DifferentialEvolution(
-            population_size=50, differential_weight=0.5, crossover_probability=0.9, grouping=grouped
-        )
-    elif algo_name == "HHO":
-        algo = HarrisHawksOptimization(grouping=grouped)
-    elif algo_name == "GWO":
-        algo = GreyWolfOptimizer(grouping=grouped)
-    elif algo_name == "BAT":
-        algo = BatAlgorithm(grouping=grouped)
-    elif algo_name == "SCA":
-        algo = SineCosineAlgorithm(grouping=grouped)
-    else:
-        raise ValueError("Invalid algorithm name")
+    if prune:
+        # Constant and duplicated columns only add dimensions to the search space
+        df, grouping_data, pruning = prune_columns(df, grouping_data)
 
+    data = Dataset(df)
 
-    res = get_rules(data, algo, grouping_data, metrics, max_evals=evaluations, logging=False, grouping=True)
+    algo = make_algorithm(algo_name, grouped, repair_groups, params, streams.algorithm)
+
+    res = get_rules(data, algo, grouping_data, METRICS, max_evals=evaluations, logging=False, grouping=True,
+                    seed=streams.problem, encoding=encoding, memory_limit=memory_limit,
+                    monitor=monitor)
 
     run_time = res.run_time
     rules = res.rules
 
+    if prune:
+        rules = reattach_features(rules, pruning)
+
     return run_time, rules
 
 if __name__ == "__main__":
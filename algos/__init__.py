@@ -0,0 +1,26 @@
+import importlib
+
+# Algorithm name -> (module, class), modules are only imported when the algorithm is used
+ALGORITHMS = {
+    "DE": ("algos.de", "DifferentialEvolution"),
+    "HHO": ("algos.hho", "HarrisHawksOptimization"),
+    "GWO": ("algos.gwo", "GreyWolfOptimizer"),
+    "BAT": ("algos.bat", "BatAlgorithm"),
+    "SCA": ("algos.sca", "SineCosineAlgorithm"),
+}
+
+
+def get_algorithm_class(algo_name):
+    r"""Import the module of an algorithm and get its class.
+
+    Args:
+        algo_name (str): Short name of the algorithm, one of the keys of ``ALGORITHMS``.
+
+    Returns:
+        Type[Algorithm]: The algorithm class.
+
+    """
+    if algo_name not in ALGORITHMS:
+        raise ValueError("Invalid algorithm name")
+    module_name, class_name = ALGORITHMS[algo_name]
+    return getattr(importlib.import_module(module_name), class_name)
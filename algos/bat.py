@@ -138,7 +138,7 @@ class BatAlgorithm(Algorithm):
 
         """
         population, fitness, d = super().init_population(task)
-        velocities = np.zeros((self.population_size, task.dimension))
+        velocities = np.zeros((self.population_size, task.dimension), dtype=population.dtype)
         d.update({'velocities': velocities, 'loudness': self.loudness})
         return population, fitness, d
 
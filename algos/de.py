@@ -35,9 +35,11 @@ def cross_rand1(pop, ic, f, cr, rng, **_kwargs):
     j = rng.integers(len(pop[ic]))
     p = [1 / (len(pop) - 1.0) if i != ic else 0 for i in range(len(pop))] if len(pop) > 3 else None
     r = rng.choice(len(pop), 3, replace=not len(pop) >= 3, p=p)
-    x = [pop[r[0]][i] + f * (pop[r[1]][i] - pop[r[2]][i]) if rng.random() < cr or i == j else pop[ic][i] for i in
-         range(len(pop[ic]))]
-    return np.asarray(x)
+    # one random number per component, as drawn component by component, and the donor component at j
+    crossover = rng.random(len(pop[ic])) < cr
+    crossover[j] = True
+    x0, x1, x2, xc = (getattr(pop[k], 'x', pop[k]) for k in (r[0], r[1], r[2], ic))
+    return np.where(crossover, x0 + f * (x1 - x2), xc)
 
 class DifferentialEvolution(Algorithm):
     r"""Implementation of Differential evolution algorithm.
@@ -162,7 +164,7 @@ class DifferentialEvolution(Algorithm):
              in range(len(pop))])
 
     def selection(self, population, new_population, best_x, best_fitness, task, **kwargs):
-        r"""Operator for selection.
+        r"""Operator for selection, the population is updated in place.
 
         Args:
             population (numpy.ndarray): Current population.
@@ -178,9 +180,11 @@ class DifferentialEvolution(Algorithm):
                 3. New global best solutions fitness/objective value.
 
         """
-        arr = objects_to_array([e if e.f < population[i].f else population[i] for i, e in enumerate(new_population)])
-        best_x, best_fitness = self.get_best(arr, np.asarray([e.f for e in arr]), best_x, best_fitness)
-        return arr, best_x, best_fitness
+        for i, e in enumerate(new_population):
+            if e.f < population[i].f:
+                population[i] = e
+        best_x, best_fitness = self.get_best(population, np.asarray([e.f for e in population]), best_x, best_fitness)
+        return population, best_x, best_fitness
 
     def post_selection(self, pop, task, xb, fxb, **kwargs):
         r"""Apply additional operation after selection.
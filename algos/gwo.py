@@ -69,22 +69,33 @@ class GreyWolfOptimizer(Algorithm):
 
         """
         pop, fpop, d = super().init_population(task)
-        si = np.argsort(fpop)
-        alpha = np.copy(pop[si[0]])
-        alpha_fitness = fpop[si[0]]
-        beta = np.copy(pop[si[1]])
-        beta_fitness = fpop[si[1]]
-        delta = np.copy(pop[si[2]])
-        delta_fitness = fpop[si[2]]
-        d.update({
-            'alpha': alpha,
-            'alpha_fitness': alpha_fitness,
-            'beta': beta,
-            'beta_fitness': beta_fitness,
-            'delta': delta,
-            'delta_fitness': delta_fitness
-        })
-        return pop, fpop, d
+        return pop, fpop, self.update_params(pop, fpop, d)
+
+    def update_params(self, population, population_fitness, params):
+        r"""Take the alpha, beta and delta of the pack from the three best wolves of the population.
+
+        Args:
+            population (numpy.ndarray): Current population.
+            population_fitness (numpy.ndarray): Current populations function/fitness values.
+            params (Dict[str, Any]): Additional arguments.
+
+        Returns:
+            Dict[str, Any]: Additional arguments with the alpha, beta and delta of the pack and their fitness.
+
+        See Also:
+            * :func:`utils.Algorithm.Algorithm.update_params`
+
+        """
+        si = np.argsort(population_fitness)
+        return {
+            **params,
+            'alpha': np.copy(population[si[0]]),
+            'alpha_fitness': population_fitness[si[0]],
+            'beta': np.copy(population[si[1]]),
+            'beta_fitness': population_fitness[si[1]],
+            'delta': np.copy(population[si[2]]),
+            'delta_fitness': population_fitness[si[2]]
+        }
 
     def run_iteration(self, task, population, population_fitness, best_x, best_fitness, **params):
         r"""Core function of GreyWolfOptimizer algorithm.
@@ -119,11 +130,13 @@ class GreyWolfOptimizer(Algorithm):
 
         a = 2 - task.evals * (2 / task.max_evals)
         for i, w in enumerate(population):
-            a1, c1 = 2 * a * self.random(task.dimension) - a, 2 * self.random(task.dimension)
+            # the six random vectors of a wolf in one block, the same numbers as six separate draws
+            r = self.random((6, task.dimension))
+            a1, c1 = 2 * a * r[0] - a, 2 * r[1]
             x1 = alpha - a1 * np.fabs(c1 * alpha - w)
-            a2, c2 = 2 * a * self.random(task.dimension) - a, 2 * self.random(task.dimension)
+            a2, c2 = 2 * a * r[2] - a, 2 * r[3]
             x2 = beta - a2 * np.fabs(c2 * beta - w)
-            a3, c3 = 2 * a * self.random(task.dimension) - a, 2 * self.random(task.dimension)
+            a3, c3 = 2 * a * r[4] - a, 2 * r[5]
             x3 = delta - a3 * np.fabs(c3 * delta - w)
             population[i] = task.repair((x1 + x2 + x3) / 3, rng=self.rng)
             population_fitness[i] = task.eval(population[i])
@@ -147,7 +147,9 @@ class SineCosineAlgorithm(Algorithm):
         r2 = self.uniform(0, 2 * np.pi)
         r3 = self.uniform(self.r_min, self.r_max)
         r4 = self.random()
-        population = np.apply_along_axis(self.next_position, 1, population, best_x, r1, r2, r3, r4, task)
-        population_fitness = np.apply_along_axis(task.eval, 1, population)
+        # moved and evaluated in place, every individual only depends on itself and the best solution
+        for i in range(len(population)):
+            population[i] = self.next_position(population[i], best_x, r1, r2, r3, r4, task)
+            population_fitness[i] = task.eval(population[i])
         best_x, best_fitness = self.get_best(population, population_fitness, best_x, best_fitness)
         return population, population_fitness, best_x, best_fitness, {}
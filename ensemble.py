@@ -0,0 +1,129 @@
+import math
+import time
+
+import numpy as np
+
+from niaarm.rule_list import RuleList
+
+from NARM_grouped import METRICS
+from mining_service import Job, MiningService
+from utils.Index import TransactionIndex
+from utils.Loader import load_groups
+from utils.Metrics import Contingency, compute_metrics
+from utils.Mine import Result
+from utils.Reduce import reduce_rules
+from utils.Seeds import spawn_runs
+from utils.SharedStore import attach
+
+
+def shard_groups(groups, shard_size=0.15, overlap=0.5):
+    r"""Split groups into deterministic, overlapping shards.
+
+    Shards are windows of consecutive groups in the order of the groups file, which keeps the
+    groups of one network element together. Consecutive windows share ``overlap`` of their groups and
+    the last windows wrap around to the first groups, so every group is in at least one shard and
+    features of neighbouring windows are mined together.
+
+    Args:
+        groups (list[dict]): Grouping data of the dataset.
+        shard_size (float): Share of the groups in every shard. Default: ``0.15``.
+        overlap (float): Share of a shard's groups also in the next shard, in ``[0, 1)``. Default: ``0.5``.
+
+    Returns:
+        list[list[dict]]: Groups of every shard.
+
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap must be in [0, 1)")
+    n = len(groups)
+    size = min(n, max(1, math.ceil(shard_size * n)))
+    if size == n:
+        return [list(groups)]
+    step = max(1, size - math.floor(overlap * size))
+    return [[groups[(start + k) % n] for k in range(size)] for start in range(0, n, step)]
+
+
+def merge_archives(archives, dataset, metrics=METRICS):
+    r"""Merge the rule archives of shards into one rule set without duplicates.
+
+    Rules are re-scored on all features of ``dataset``, since inclusion depends on the number of
+    features of the shard a rule was mined on. A rule found in several shards is kept once.
+
+    Args:
+        archives (Iterable[RuleList]): Rules of every shard.
+        dataset (Dataset): Dataset holding the features of all shards.
+        metrics (Sequence[str]): Metrics of the fitness, weighted equally.
+
+    Returns:
+        RuleList: The merged rules, sorted by fitness.
+
+    """
+    index = TransactionIndex(dataset.transactions, dataset.features)
+    merged = {}
+    for rules in archives:
+        for rule in rules:
+            key = repr(rule)
+            if key not in merged:
+                merged[key] = index.rule(rule.antecedent, rule.consequent)
+
+    rules = RuleList(merged.values())
+    if len(rules):
+        values = compute_metrics(Contingency.from_rules(rules), metrics)
+        for rule, fitness in zip(rules, np.mean([values[metric] for metric in metrics], axis=0)):
+            rule.fitness = fitness
+    rules.sort()
+    return rules
+
+
+def mine_ensemble(service, dataset_name, algo_name, evaluations, shard_size=0.15, overlap=0.5, grouped=True,
+                  params=None, reduce=False, similarity=1.0, seed=None):
+    r"""Mine all groups of a dataset as an ensemble of overlapping shards.
+
+    The groups are split by :func:`shard_groups`. Every shard is mined as one job of the service, whose
+    workers share the dataset, and the archives of all shards are merged by :func:`merge_archives`.
+
+    Args:
+        service (MiningService): Service running the jobs, with ``dataset_name`` among its shared datasets.
+        dataset_name (str): Dataset to mine.
+        algo_name (str): Algorithm mining every shard.
+        evaluations (int): Maximum number of fitness evaluations per shard.
+        shard_size (float): Share of the groups in every shard. Default: ``0.15``.
+        overlap (float): Share of a shard's groups also in the next shard. Default: ``0.5``.
+        grouped (bool): Enable grouping in the algorithm. Default: ``True``.
+        params (Optional[dict]): Algorithm parameters, overriding ``ALGORITHM_PARAMETERS``.
+        reduce (bool): Also remove dominated rules with :func:`utils.Reduce.reduce_rules`. Default: ``False``.
+        similarity (float): Minimum Jaccard similarity of rules clustered by ``reduce``. Default: ``1``, no clustering.
+        seed (Union[None, int, numpy.random.SeedSequence]): Root seed, every shard gets an independent seed spawned from it.
+
+    Returns:
+        Result: A named tuple containing the merged rules and the wall time of the ensemble in seconds.
+
+    """
+    start_time = time.perf_counter()
+    shards = shard_groups(load_groups(dataset_name, root=service.root), shard_size, overlap)
+    seeds = spawn_runs(seed, len(shards))
+    results = service.map([
+        Job(dataset_name, algo_name, evaluations, groups=groups, grouped=grouped, params=params, seed=shard_seed)
+        for groups, shard_seed in zip(shards, seeds)
+    ])
+
+    dataset = attach(service.stores[dataset_name].name)
+    rules = merge_archives([result.rules for result in results], dataset)
+    if reduce:
+        rules = reduce_rules(rules, dataset, similarity=similarity)
+    return Result(rules, time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    dataset_name = "leakdb"
+    algo_name = "GWO"
+    evaluations = 10000
+
+    service = MiningService(shared=[dataset_name])
+    try:
+        rules, run_time = mine_ensemble(service, dataset_name, algo_name, evaluations)
+    finally:
+        service.shutdown()
+
+    print(run_time)
+    print(rules)
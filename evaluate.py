@@ -1,66 +1,47 @@
-import numpy as np
 import json
-from NARM_grouped import main
+import pandas as pd
+from NARM_grouped import SUBSAMPLED_DATASETS, main
+from utils.Results import append_runs, run_summary
+from utils.Seeds import spawn_runs
 
-def evaluate_algorithm(group, evals, iterations, dataset_name, algo_name, subsampling_factor):
-    runtimes = []
-    confidences = []
-    supports = []
-    fitnesses = []
-    lifts = []
-    zhangs = []
-    yulesqs = []
-    coverages = []
-    n_rules_learned = []
+def evaluate_algorithm(group, evals, iterations, dataset_name, algo_name, subsampling_factor, seed=None):
+    runs = []
+    # an independent, reproducible seed per iteration
+    seeds = spawn_runs(seed, iterations)
 
     for i in range(iterations):
         print(f"Group: {group}, Evals: {evals}, Iteration: {i}")
-        runtime, rules = main(grouped=group, evaluations=evals, dataset_name=dataset_name, algo_name=algo_name, subsampling_factor=subsampling_factor)
+        runtime, rules = main(grouped=group, evaluations=evals, dataset_name=dataset_name, algo_name=algo_name, subsampling_factor=subsampling_factor, seed=seeds[i])
 
-        runtimes.append(runtime)
-        if len(rules) == 0:
-            confidences.append(0)
-            supports.append(0)
-            fitnesses.append(0)
-            lifts.append(0)
-            zhangs.append(0)
-            yulesqs.append(0)
-            coverages.append(0)
-            n_rules_learned.append(0)
-
-            print(f"Runtime: {runtime}, rules learned: {0}\n\n")
-            continue
-
-        confidences.append(rules.mean("confidence"))
-        supports.append(rules.mean("support"))
-        fitnesses.append(rules.mean("fitness"))
-        lifts.append(rules.mean("lift"))
-        zhangs.append(rules.mean("zhang"))
-        yulesqs.append(rules.mean("yulesq"))
-        coverages.append(rules.mean("coverage"))
-        n_rules_learned.append(len(rules))
+        # runtime, number of rules and all metric means from one pass over the rules
+        runs.append(run_summary(rules, runtime))
 
         print(f"Runtime: {runtime}, rules learned: {len(rules)}\n\n")
 
+    # main mines all groups of the other datasets, whatever the factor
+    append_runs(runs, algorithm=algo_name, dataset=dataset_name, evaluations=evals, grouped=group,
+                subsampling_factor=subsampling_factor if dataset_name in SUBSAMPLED_DATASETS else None)
+
+    table = pd.DataFrame(runs)
     return {
-        "runtimes": runtimes,
-        "confidences": confidences,
-        "supports": supports,
-        "fitnesses": fitnesses,
-        "lifts": lifts,
-        "zhangs": zhangs,
-        "yulesqs": yulesqs,
-        "coverages": coverages,
-        "n_rules_learned": n_rules_learned,
-        "mean_runtime": np.mean(runtimes),
-        "mean_confidence": np.mean(confidences),
-        "mean_support": np.mean(supports),
-        "mean_fitness": np.mean(fitnesses),
-        "mean_lift": np.mean(lifts),
-        "mean_zhang": np.mean(zhangs),
-        "mean_yulesQ": np.mean(yulesqs),
-        "mean_coverage": np.mean(coverages),
-        "mean_n_rules_learned": np.mean(n_rules_learned)
+        "runtimes": table["runtime"].tolist(),
+        "confidences": table["confidence"].tolist(),
+        "supports": table["support"].tolist(),
+        "fitnesses": table["fitness"].tolist(),
+        "lifts": table["lift"].tolist(),
+        "zhangs": table["zhang"].tolist(),
+        "yulesqs": table["yulesq"].tolist(),
+        "coverages": table["coverage"].tolist(),
+        "n_rules_learned": table["n_rules"].tolist(),
+        "mean_runtime": table["runtime"].mean(),
+        "mean_confidence": table["confidence"].mean(),
+        "mean_support": table["support"].mean(),
+        "mean_fitness": table["fitness"].mean(),
+        "mean_lift": table["lift"].mean(),
+        "mean_zhang": table["zhang"].mean(),
+        "mean_yulesQ": table["yulesq"].mean(),
+        "mean_coverage": table["coverage"].mean(),
+        "mean_n_rules_learned": table["n_rules"].mean()
     }
 
 def main_evaluation():
@@ -68,6 +49,7 @@ def main_evaluation():
     dataset_name = "lbnl_fdd"
     algo_name = "GWO"
     subsampling_factor = 0.2
+    seed = 42
 
     for evals in [10000, 25000, 50000]:
         eval_results = []
@@ -75,7 +57,9 @@ def main_evaluation():
         for group in [True, False]:
             iterations = 50
             print(f"Amount of iterations: {iterations}")
-            result = evaluate_algorithm(group, evals, iterations, dataset_name, algo_name, subsampling_factor)
+            # the same seeds with and without grouping, so both settings mine the same groups in every iteration
+            result = evaluate_algorithm(group, evals, iterations, dataset_name, algo_name, subsampling_factor,
+                                        seed=[seed, evals])
             results.append({
                 "group": group,
                 "evals": evals,
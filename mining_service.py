@@ -0,0 +1,253 @@
+import os
+import secrets
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+import numpy as np
+
+from NARM_grouped import METRICS, make_algorithm, select_groups
+from utils.Loader import DATASET_DIR, Dataset, load_dataset, load_groups, group_features
+from utils.Mine import get_rules
+from utils.Monitor import ForwardingMonitor
+from utils.Seeds import run_streams
+from utils.SharedStore import SharedDataset, SharedTransactions, attach
+
+ADDRESS = ("localhost", 6000)
+# Environment variable holding the authentication key as hex, otherwise a random key is generated per start
+AUTHKEY_ENV = "NARM_AUTHKEY"
+# File a serving process writes its key to, readable only by its user
+KEY_FILE = os.path.join(os.path.expanduser("~"), ".narm_service_key")
+
+
+def load_authkey(key_file=KEY_FILE):
+    r"""Get the authentication key of the service from ``NARM_AUTHKEY`` or the key file written by :meth:`MiningService.serve`.
+
+    Args:
+        key_file (str): Key file of the service.
+
+    Returns:
+        bytes: The authentication key.
+
+    """
+    if os.environ.get(AUTHKEY_ENV):
+        return bytes.fromhex(os.environ[AUTHKEY_ENV])
+    with open(key_file, "r") as f:
+        return bytes.fromhex(f.read().strip())
+
+
+def _write_key_file(authkey, key_file):
+    # created with owner-only permissions, and tightened if it already existed
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(authkey.hex())
+
+
+class Job(namedtuple("Job", ("dataset_name", "algo_name", "evaluations", "groups", "grouped", "subsampling_factor",
+                             "params", "seed"))):
+    """A mining job as a ``namedtuple``.
+
+    Attributes:
+        dataset_name (str): Name of the dataset, e.g. ``leakdb``.
+        algo_name (str): Name of the algorithm, one of ``DE``, ``HHO``, ``GWO``, ``BAT`` or ``SCA``.
+        evaluations (int): Maximum number of fitness evaluations.
+        groups (Optional[list[dict]]): Groups to mine. Default: all groups of the dataset,
+         or a random subset if ``subsampling_factor`` is set.
+        grouped (bool): Enable grouping in the algorithm. Default: ``True``.
+        subsampling_factor (Optional[float]): Share of groups to select at random when ``groups`` is not given.
+        params (Optional[dict]): Algorithm parameters, overriding ``ALGORITHM_PARAMETERS``.
+        seed (Union[None, int, numpy.random.SeedSequence]): Seed of the job, split into the streams of
+         :func:`utils.Seeds.run_streams`. Default: fresh entropy, so jobs are independent but not reproducible.
+
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, dataset_name, algo_name, evaluations, groups=None, grouped=True, subsampling_factor=None,
+                params=None, seed=None):
+        return super().__new__(cls, dataset_name, algo_name, evaluations, groups, grouped, subsampling_factor, params,
+                               seed)
+
+
+# Per worker process cache of preprocessed datasets and their grouping data
+_datasets = {}
+_dataset_root = DATASET_DIR
+_shared_names = {}
+_metrics_queue = None
+
+
+def _init_worker(root, shared_names, metrics_queue=None):
+    global _dataset_root, _shared_names, _metrics_queue
+    _dataset_root = root
+    _shared_names = shared_names
+    _metrics_queue = metrics_queue
+
+
+def _cached_dataset(dataset_name):
+    if dataset_name not in _datasets:
+        if dataset_name in _shared_names:
+            dataset = attach(_shared_names[dataset_name])
+        else:
+            dataset = Dataset(load_dataset(dataset_name, root=_dataset_root))
+        _datasets[dataset_name] = (dataset, load_groups(dataset_name, root=_dataset_root))
+    return _datasets[dataset_name]
+
+
+def run_job(job):
+    r"""Mine rules for one job on the cached dataset of the current worker.
+
+    Args:
+        job (Job): The job to run.
+
+    Returns:
+        Result: A named tuple containing the list of mined rules and the algorithm's run time in seconds.
+
+    """
+    dataset, group_info = _cached_dataset(job.dataset_name)
+    # every job draws from its own streams instead of the worker's global random state
+    streams = run_streams(job.seed)
+
+    groups = job.groups
+    if groups is None and job.subsampling_factor:
+        groups = select_groups(group_info, job.subsampling_factor, np.random.default_rng(streams.subsample))
+    elif groups is None:
+        groups = group_info
+
+    columns = set(group_features(groups))
+    if columns.issuperset(dataset.header):
+        data = dataset
+    elif isinstance(dataset, SharedDataset):
+        data = dataset.select(columns)
+    else:
+        data = Dataset(dataset.transactions.loc[:, [col for col in dataset.header if col in columns]])
+
+    monitor = None
+    if _metrics_queue is not None:
+        # the latest job of every worker process is exposed
+        monitor = ForwardingMonitor(_metrics_queue, worker=os.getpid(), dataset=job.dataset_name,
+                                    algorithm=job.algo_name)
+
+    algo = make_algorithm(job.algo_name, job.grouped, params=job.params, seed=streams.algorithm)
+    return get_rules(data, algo, groups, METRICS, max_evals=job.evaluations, logging=False, grouping=True,
+                     seed=streams.problem, monitor=monitor)
+
+
+class MiningService:
+    r"""Long-lived mining service that runs jobs on a shared process pool.
+
+    Every worker keeps the datasets it has loaded in memory, so repeated jobs on the same
+    dataset skip interpreter startup, file reading and feature extraction.
+
+    Args:
+        processes (Optional[int]): Number of worker processes. Default: number of CPUs.
+        root (str): Directory containing the datasets.
+        shared (Iterable[str]): Datasets to load once in this process and share with all workers
+         through shared memory, instead of every worker loading its own copy.
+        metrics (Optional[MetricsServer]): Expose the progress of the current job of every worker through this
+         :class:`utils.Monitor.MetricsServer`, labeled with the worker's process id. Default: ``None``.
+
+    Attributes:
+        root (str): Directory containing the datasets.
+        stores (dict[str, SharedTransactions]): Shared transactions of the datasets in ``shared``.
+
+    """
+
+    def __init__(self, processes=None, root=DATASET_DIR, shared=(), metrics=None):
+        self.root = root
+        self.stores = {
+            dataset_name: SharedTransactions(Dataset(load_dataset(dataset_name, root=root)))
+            for dataset_name in shared
+        }
+        shared_names = {dataset_name: store.name for dataset_name, store in self.stores.items()}
+        self.pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                        initargs=(root, shared_names, metrics.queue() if metrics else None))
+
+    def submit(self, job):
+        r"""Queue a job and get a ``concurrent.futures.Future`` of its ``Result``."""
+        return self.pool.submit(run_job, job)
+
+    def map(self, jobs):
+        r"""Run the jobs and get their results in order."""
+        return [future.result() for future in [self.submit(job) for job in jobs]]
+
+    def serve(self, address=ADDRESS, authkey=None, key_file=KEY_FILE):
+        r"""Accept jobs over a local socket until interrupted.
+
+        Every connection sends a list of jobs and receives the list of results in the same order.
+        A job that fails is answered with its exception.
+
+        Messages are pickled, so the authentication key is all that keeps other users from running code in
+        the service. Unless given or set in ``NARM_AUTHKEY``, a random key is generated for every start. It is
+        written to ``key_file`` with owner-only permissions for :func:`submit_jobs` and removed on exit.
+
+        Args:
+            address (Union[Tuple[str, int], str]): Address to listen on, a path is an ``AF_UNIX`` socket.
+            authkey (Optional[bytes]): Authentication key. Default: from ``NARM_AUTHKEY``, or random.
+            key_file (str): File to hand the key to clients.
+
+        """
+        if authkey is None:
+            authkey = bytes.fromhex(os.environ[AUTHKEY_ENV]) if os.environ.get(AUTHKEY_ENV) else secrets.token_bytes(32)
+        _write_key_file(authkey, key_file)
+        # a unix socket is created accessible to its user only
+        umask = os.umask(0o177) if isinstance(address, str) else None
+        try:
+            listener = Listener(address, authkey=authkey)
+        finally:
+            if umask is not None:
+                os.umask(umask)
+        try:
+            with listener:
+                while True:
+                    try:
+                        conn = listener.accept()
+                    except AuthenticationError:
+                        # a client without the key is dropped, the service keeps running
+                        continue
+                    threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            os.unlink(key_file)
+
+    def _handle(self, conn):
+        with conn:
+            futures = [self.submit(Job(*job)) for job in conn.recv()]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+            conn.send(results)
+
+    def shutdown(self):
+        self.pool.shutdown()
+        for store in self.stores.values():
+            store.close()
+
+
+def submit_jobs(jobs, address=ADDRESS, authkey=None):
+    r"""Send jobs to a running service and wait for their results.
+
+    Args:
+        jobs (list[Job]): Jobs to run.
+        address (Union[Tuple[str, int], str]): Address of the service.
+        authkey (Optional[bytes]): Authentication key of the service. Default: :func:`load_authkey`.
+
+    Returns:
+        list[Union[Result, Exception]]: Results in the order of ``jobs``.
+
+    """
+    with Client(address, authkey=authkey if authkey is not None else load_authkey()) as conn:
+        conn.send([tuple(job) for job in jobs])
+        return conn.recv()
+
+
+if __name__ == "__main__":
+    service = MiningService()
+    try:
+        service.serve()
+    finally:
+        service.shutdown()
@@ -0,0 +1,16 @@
+import os
+import sys
+import glob
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.Loader import convert_csv
+
+# Convert every csv dataset once, so runs can read only the columns of the selected groups
+if __name__ == "__main__":
+    dataset_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "datasets")
+    fmt = sys.argv[2] if len(sys.argv) > 2 else "parquet"
+
+    for csv_path in sorted(glob.glob(os.path.join(dataset_dir, "*.csv"))):
+        out_path = convert_csv(csv_path, fmt)
+        print(f"{csv_path} -> {out_path}")
@@ -1,24 +1,36 @@
-import json
+import os
+import sys
 import matplotlib.pyplot as plt
 
-# Load the data
-data = json.load(open('execution_times.json'))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
 
-# Initialize data structures for combined plots
-lbnl_data = {algo: {"evals": [], "grouped": [], "regular": []} for algo in data.keys()}
-leakdb_data = {algo: {"evals": [], "grouped": [], "regular": []} for algo in data.keys()}
+from utils.Results import RESULTS_STORE, load_runs
 
-# Populate the data structures
-for algo in data.keys():
-    for eval in sorted(data[algo]["lbnl_fdd"].keys(), key=int):
-        lbnl_data[algo]["evals"].append(eval)
-        lbnl_data[algo]["grouped"].append(data[algo]["lbnl_fdd"][eval]["grouped"])
-        lbnl_data[algo]["regular"].append(data[algo]["lbnl_fdd"][eval]["regular"])
+# Mean runtime per algorithm, dataset, budget and grouping, as a column per grouping
+runs = load_runs(os.path.join(ROOT, RESULTS_STORE))
+runtimes = runs.groupby(["algorithm", "dataset", "evaluations", "grouped"])["runtime"].mean().unstack("grouped")
 
-    for eval in sorted(data[algo]["leakdb"].keys(), key=int):
-        leakdb_data[algo]["evals"].append(eval)
-        leakdb_data[algo]["grouped"].append(data[algo]["leakdb"][eval]["grouped"])
-        leakdb_data[algo]["regular"].append(data[algo]["leakdb"][eval]["regular"])
+
+def execution_times(dataset):
+    data = {}
+    if dataset not in runtimes.index.get_level_values("dataset"):
+        print(f"No runs of {dataset}")
+        return data
+    # a grouping without runs is plotted as a gap, as are budgets missing for one grouping
+    grouped_runtimes = runtimes.reindex(columns=[True, False])
+    for algo, times in grouped_runtimes.xs(dataset, level="dataset").groupby(level="algorithm"):
+        times = times.droplevel("algorithm").sort_index()
+        data[algo] = {
+            "evals": [str(evals) for evals in times.index],
+            "grouped": times[True].tolist(),
+            "regular": times[False].tolist(),
+        }
+    return data
+
+
+lbnl_data = execution_times("lbnl_fdd")
+leakdb_data = execution_times("leakdb")
 
 # Plot for lbnl_fdd
 plt.figure(figsize=(12, 8))
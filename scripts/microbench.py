@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.Loader import Dataset
+from utils.NiaArm import NiaARM, _cut_point
+
+FEATURE_SIZES = [10, 50, 100, 500, 1000, 5000]
+TRANSACTION_SIZES = [100, 1000, 10000, 100000, 1000000]
+
+# Decoding does not touch the transactions, so those benchmarks run on a small table
+DECODE_TRANSACTIONS = 100
+
+# Skip _evaluate cells whose transaction table would exceed this many values (~400MB of float64)
+MAX_CELLS = 50_000_000
+
+
+def synthetic_dataset(num_features, num_transactions, rng, cat_ratio=0.2, group_size=5):
+    r"""Generate a synthetic sensor table with leakdb-like feature groups.
+
+    Args:
+        num_features (int): Number of columns.
+        num_transactions (int): Number of rows.
+        rng (numpy.random.Generator): Random generator.
+        cat_ratio (float): Share of categorical columns.
+        group_size (int): Number of consecutive features in one group.
+
+    Returns:
+        Tuple[Dataset, list[dict]]:
+            1. Dataset built from the synthetic table.
+            2. Grouping data in the format of ``datasets/*_groups.json``.
+
+    """
+    columns = {}
+    group_info = []
+    for start in range(0, num_features, group_size):
+        group = {}
+        for j in range(start, min(start + group_size, num_features)):
+            name = f"f{j}"
+            if rng.random() < cat_ratio:
+                columns[name] = pd.Categorical(rng.choice(["A", "B", "C"], num_transactions))
+                group[name] = "categorical"
+            else:
+                columns[name] = rng.normal(0.0, 1.0, num_transactions)
+                group[name] = "numerical"
+        group_info.append(group)
+
+    return Dataset(pd.DataFrame(columns)), group_info
+
+
+def time_call(fn, args_list, min_time=0.2, max_calls=10000, setup=None):
+    r"""Measure the mean per-call latency of ``fn``.
+
+    Args:
+        fn (Callable): Function to benchmark.
+        args_list (list[tuple]): Argument tuples, cycled through while timing.
+        min_time (float): Keep calling until at least this many seconds have been spent in ``fn``.
+        max_calls (int): Upper bound on the number of calls.
+        setup (Optional[Callable]): Called without arguments before every call, outside the timed section.
+
+    Returns:
+        Tuple[float, int]: Seconds per call and number of calls made.
+
+    """
+    calls = 0
+    elapsed = 0.0
+    while elapsed < min_time and calls < max_calls:
+        args = args_list[calls % len(args_list)]
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        elapsed += time.perf_counter() - start
+        calls += 1
+    return elapsed / calls, calls
+
+
+def make_problem(dataset, group_info, grouping=True):
+    return NiaARM(dataset.dimension, dataset.features, dataset.transactions, group_info,
+                  ("support", "confidence"), logging=False, grouping=grouping)
+
+
+def bench_decode(num_features, rng, population_size=20):
+    r"""Benchmark the transaction independent part of the hot path for one feature count."""
+    dataset, group_info = synthetic_dataset(num_features, DECODE_TRANSACTIONS, rng)
+    problem = make_problem(dataset, group_info)
+    vectors = [rng.uniform(0.0, 1.0, dataset.dimension) for _ in range(population_size)]
+    missing = [[f"f{j}" for j in range(0, num_features, 2)]]
+    population = np.asarray(vectors)
+
+    results = {}
+    results["build_rule"] = time_call(problem.build_rule, [(v[:-1],) for v in vectors])
+    results["adapt_vector"] = time_call(problem.adapt_vector, [(v.copy(), missing[0]) for v in vectors])
+    results["initial_population_grouping_np"] = time_call(
+        problem.initial_population_grouping_np, [(population,)], max_calls=20)
+    results["_cut_point"] = time_call(_cut_point, [(v[-1], num_features) for v in vectors])
+    return results
+
+
+def bench_evaluate(num_features, num_transactions, rng, population_size=20, max_calls=200):
+    r"""Benchmark ``NiaARM._evaluate`` for one feature count and transaction count.
+
+    The uncached latency evaluates a fresh vector per call with the caches of the transaction index
+    dropped before it. The cached latency cycles through ``population_size`` vectors evaluated once
+    before timing, as an algorithm revisiting the same rules would.
+
+    Returns:
+        dict[str, Tuple[float, int]]: Seconds per call and number of calls, ``uncached`` and ``cached``.
+
+    """
+    dataset, group_info = synthetic_dataset(num_features, num_transactions, rng)
+    problem = make_problem(dataset, group_info)
+
+    fresh = [(rng.uniform(0.0, 1.0, dataset.dimension),) for _ in range(max_calls)]
+    uncached = time_call(problem._evaluate, fresh, max_calls=max_calls, setup=problem.clear_caches)
+
+    vectors = [(rng.uniform(0.0, 1.0, dataset.dimension),) for _ in range(population_size)]
+    for args in vectors:
+        problem._evaluate(*args)
+    cached = time_call(problem._evaluate, vectors, max_calls=max_calls)
+    return {"uncached": uncached, "cached": cached}
+
+
+def scaling_exponents(sizes, latencies):
+    r"""Log-log slope between consecutive measurements, 1.0 means linear and 2.0 quadratic scaling."""
+    exponents = []
+    for i in range(1, len(sizes)):
+        exponents.append(np.log(latencies[i] / latencies[i - 1]) / np.log(sizes[i] / sizes[i - 1]))
+    return exponents
+
+
+def print_curve(title, sizes, latencies):
+    print(title)
+    exponents = [None] + scaling_exponents(sizes, latencies)
+    for size, latency, exponent in zip(sizes, latencies, exponents):
+        slope = f"{exponent:6.2f}" if exponent is not None else "     -"
+        print(f"  {size:>9}  {latency * 1e6:14.1f} us/call   slope {slope}")
+
+
+def main(feature_sizes=FEATURE_SIZES, transaction_sizes=TRANSACTION_SIZES, seed=42, output=None):
+    rng = np.random.default_rng(seed)
+    report = {"decode": {}, "evaluate": {}}
+
+    decode = {}
+    for num_features in feature_sizes:
+        print(f"Decode benchmarks, features: {num_features}")
+        decode[num_features] = bench_decode(num_features, rng)
+    for name in ["build_rule", "adapt_vector", "initial_population_grouping_np", "_cut_point"]:
+        latencies = [decode[f][name][0] for f in feature_sizes]
+        print_curve(f"{name} vs. number of features", feature_sizes, latencies)
+        report["decode"][name] = {str(f): latency for f, latency in zip(feature_sizes, latencies)}
+
+    for num_features in feature_sizes:
+        sizes = []
+        latencies = {"uncached": [], "cached": []}
+        for num_transactions in transaction_sizes:
+            if num_features * num_transactions > MAX_CELLS:
+                print(f"Skipping _evaluate, features: {num_features}, transactions: {num_transactions}")
+                continue
+            results = bench_evaluate(num_features, num_transactions, rng)
+            sizes.append(num_transactions)
+            for mode in latencies:
+                latencies[mode].append(results[mode][0])
+        if sizes:
+            report["evaluate"][str(num_features)] = {}
+            for mode, values in latencies.items():
+                print_curve(f"_evaluate vs. number of transactions ({num_features} features, {mode})", sizes, values)
+                report["evaluate"][str(num_features)][mode] = {str(n): latency for n, latency in zip(sizes, values)}
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    return report
+
+
+if __name__ == "__main__":
+    main(output="microbench_results.json")
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median seconds importing NARM_grouped may add to a bare interpreter started by the same benchmark
+STARTUP_BUDGET = 1.5
+# Modules the import must not load, niaarm's text mining stack
+DEFERRED_MODULES = ("niaarm.text", "nltk", "scipy")
+
+
+def time_startup(statement, repeats):
+    r"""Wall time of running ``statement`` in fresh interpreters.
+
+    Returns:
+        numpy.ndarray: Seconds per run.
+
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def slowest_imports(statement, top=15):
+    r"""Modules with the largest cumulative import time, from ``python -X importtime``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    imports = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def loaded_modules(statement, modules):
+    r"""Which of ``modules`` are in ``sys.modules`` after running ``statement`` in a fresh interpreter."""
+    check = f"{statement}; import sys; print(' '.join(m for m in {tuple(modules)!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return out.split()
+
+
+def main(repeats=5):
+    baseline = time_startup("pass", repeats)
+    startup = time_startup("import NARM_grouped", repeats)
+    algorithm = time_startup("import NARM_grouped; NARM_grouped.make_algorithm('GWO', True)", repeats)
+
+    print(f"Interpreter:              {np.median(baseline):.3f} s")
+    print(f"import NARM_grouped:      {np.median(startup):.3f} s")
+    print(f"+ one algorithm imported: {np.median(algorithm):.3f} s")
+    print("Slowest imports (cumulative):")
+    for cumulative, module in slowest_imports("import NARM_grouped"):
+        print(f"  {cumulative / 1e6:7.3f} s  {module}")
+
+    status = 0
+    overhead = np.median(startup) - np.median(baseline)
+    if overhead > STARTUP_BUDGET:
+        print(f"Startup adds {overhead:.3f} s to the interpreter, over the budget of {STARTUP_BUDGET} s")
+        status = 1
+    loaded = loaded_modules("import NARM_grouped", DEFERRED_MODULES)
+    if loaded:
+        print(f"import NARM_grouped loads {', '.join(loaded)}")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
-import json
+import os
+import sys
+
 import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.Results import RESULTS_STORE, load_runs, summarize
 
 def fill_latex_table(values):
     # Ensure the values list has the correct number of elements
@@ -126,56 +134,56 @@ def fill_latex_table_v3(values):
 
 algos = ['DE', 'BAT', 'GWO', 'HHO', 'SCA']
 datasets = ['lbnl_fdd', 'leakdb']
+budgets = [10000, 25000, 50000, 100000]
+
+runs = load_runs(os.path.join(ROOT, RESULTS_STORE))
+# leakdb runs are compared on 20% of the groups
+runs = runs[(runs["dataset"] != "leakdb") | (runs["subsampling_factor"] == 0.2)]
+summary = summarize(runs, by=("algorithm", "dataset", "evaluations", "grouped"))
+
+
+def lookup(dataset, algo, evals, grouped, metric):
+    # configurations without runs are left empty in the tables
+    key = (algo, dataset, evals, grouped)
+    return summary.loc[key, metric] if key in summary.index else np.nan
+
+
+def grouped_and_regular(dataset, algo, evals, metric):
+    return [lookup(dataset, algo, evals, True, metric), lookup(dataset, algo, evals, False, metric)]
+
+
+def cell(value):
+    return "--" if pd.isna(value) else round(value, 3)
+
+
+results1 = [
+    value
+    for dataset in datasets
+    for algo in algos
+    for metric in ("confidence", "support", "lift", "coverage")
+    for value in grouped_and_regular(dataset, algo, 50000, metric)
+]
+
+results2 = [
+    value
+    for dataset in datasets
+    for algo in algos
+    for metric in ("zhang", "yulesq", "n_rules")
+    for value in grouped_and_regular(dataset, algo, 50000, metric)
+]
 
-results1 = []
-results2 = []
-
-for dataset in datasets:
-    for algo in algos:
-        path = f"../results/{algo}/{dataset}/results_50000.json"
-
-        if dataset == "leakdb":
-            path = f"../results/{algo}/{dataset}/results_50000_sf(0.2).json"
-
-        with open(path, "r") as f:
-            file_results = list(json.load(f))
-            grouped = file_results[0]
-            regular = file_results[1]
-
-            mean_confidence_grouped = grouped["mean_confidence"]
-            mean_confidence = regular["mean_confidence"]
-            mean_support_grouped = grouped["mean_support"]
-            mean_support = regular["mean_support"]
-            mean_lift_grouped = grouped["mean_lift"]
-            mean_lift = regular["mean_lift"]
-            mean_coverage_grouped = grouped["mean_coverage"]
-            mean_coverage = regular["mean_coverage"]
-            mean_zhang_grouped = grouped["mean_zhang"]
-            mean_zhang = regular["mean_zhang"]
-            mean_yulesQ_grouped = grouped["mean_yulesQ"]
-            mean_yulesQ = regular["mean_yulesQ"]
-            mean_n_rules_learned_grouped = grouped["mean_n_rules_learned"]
-            mean_n_rules_learned = regular["mean_n_rules_learned"]
-
-            results1.extend([
-                mean_confidence_grouped, mean_confidence,
-                mean_support_grouped, mean_support,
-                mean_lift_grouped, mean_lift,
-                mean_coverage_grouped, mean_coverage,
-            ])
-
-            results2.extend([
-                mean_zhang_grouped, mean_zhang,
-                mean_yulesQ_grouped, mean_yulesQ,
-                mean_n_rules_learned_grouped, mean_n_rules_learned,
-            ])
-
-results3 = [i for i in range(240, 480)]
+results3 = [
+    value
+    for metric in ("confidence", "support", "lift", "coverage", "zhang", "yulesq")
+    for evals in budgets
+    for algo in algos
+    for value in grouped_and_regular("lbnl_fdd", algo, evals, metric)
+]
 
 # Example usage
-rounded_results1 = [round(result, 3) for result in results1]
-rounded_results2 = [round(result, 3) for result in results2]
-rounded_results3 = [round(result, 3) for result in results3]
+rounded_results1 = [cell(result) for result in results1]
+rounded_results2 = [cell(result) for result in results2]
+rounded_results3 = [cell(result) for result in results3]
 
 latex_code = fill_latex_table(rounded_results1)
 # print(latex_code)
@@ -0,0 +1,117 @@
+import json
+import math
+import itertools
+
+import numpy as np
+
+from mining_service import Job, MiningService
+from utils.Results import SWEEP_STORE, append_runs, run_summary
+from utils.Seeds import spawn_runs
+
+# Parameter values tried for every algorithm, the grid of their combinations is swept
+PARAMETER_SPACES = {
+    "DE": {"population_size": [20, 50, 100], "differential_weight": [0.5, 0.8, 1.0], "crossover_probability": [0.5, 0.9]},
+    "GWO": {"population_size": [20, 50, 100]},
+    "HHO": {"population_size": [20, 40, 80], "levy": [0.01, 0.1]},
+    "BAT": {"population_size": [20, 40, 80], "loudness": [0.5, 1.0], "pulse_rate": [0.5, 1.0]},
+    "SCA": {"population_size": [25, 50], "a": [2, 3], "r_max": [1, 2]},
+}
+
+
+def configurations(space):
+    r"""All parameter combinations of a parameter space.
+
+    Args:
+        space (dict[str, list]): Values of every parameter.
+
+    Returns:
+        list[dict]: One dict of parameters per combination.
+
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def successive_halving(service, dataset_name, algo_names, min_evals, max_evals, eta=3, repeats=3,
+                       groupings=(True, False), subsampling_factor=None, spaces=PARAMETER_SPACES,
+                       objective="fitness", store=SWEEP_STORE, seed=None):
+    r"""Tune algorithm parameters by successive halving.
+
+    Every configuration, an algorithm with one of its parameter combinations and a grouping setting, is
+    run ``repeats`` times with ``min_evals`` evaluations. The best ``1 / eta`` of the configurations by
+    the mean of ``objective`` over their runs get ``eta`` times the budget, until ``max_evals`` is
+    reached or one configuration is left. All runs are appended to a results store, with their
+    parameters as json and their round as ``stage``.
+
+    Args:
+        service (MiningService): Service running the jobs, its workers keep the dataset cached.
+        dataset_name (str): Dataset to mine.
+        algo_names (Iterable[str]): Algorithms to tune.
+        min_evals (int): Budget of the first round.
+        max_evals (int): Budget of the last round.
+        eta (int): Reduction factor of the configurations and growth factor of the budget. Default: ``3``.
+        repeats (int): Runs per configuration and round. Default: ``3``.
+        groupings (Iterable[bool]): Grouping settings to tune. Default: with and without grouping.
+        subsampling_factor (Optional[float]): Share of groups selected at random for every run.
+        spaces (dict[str, dict[str, list]]): Parameter space of every algorithm.
+        objective (str): Column of :func:`utils.Results.run_summary` to maximize. Default: ``fitness``.
+        store (str): Path of the results store.
+        seed (Union[None, int, numpy.random.SeedSequence]): Root seed. The repeats of a round get seeds spawned
+         from it, shared by all configurations so they are compared on the same random streams.
+
+    Returns:
+        list[Tuple[float, str, bool, dict]]: Score, algorithm, grouping and parameters of the configurations
+        of the last round, best first.
+
+    """
+    candidates = [
+        (algo_name, grouped, params)
+        for algo_name in algo_names
+        for grouped in groupings
+        for params in configurations(spaces.get(algo_name, {}))
+    ]
+
+    evals = min_evals
+    stage = 0
+    while True:
+        seeds = spawn_runs([seed, stage] if seed is not None else None, repeats)
+        jobs = [
+            Job(dataset_name, algo_name, evals, grouped=grouped, subsampling_factor=subsampling_factor, params=params,
+                seed=seeds[r])
+            for algo_name, grouped, params in candidates
+            for r in range(repeats)
+        ]
+        results = service.map(jobs)
+
+        ranking = []
+        for k, (algo_name, grouped, params) in enumerate(candidates):
+            runs = [run_summary(res.rules, res.run_time) for res in results[k * repeats:(k + 1) * repeats]]
+            append_runs(runs, store, algorithm=algo_name, dataset=dataset_name, evaluations=evals, grouped=grouped,
+                        subsampling_factor=subsampling_factor, params=json.dumps(params, sort_keys=True),
+                        stage=stage)
+            ranking.append((np.mean([run[objective] for run in runs]), algo_name, grouped, params))
+        ranking.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        print(f"Stage {stage}: {len(candidates)} configurations with {evals} evaluations, "
+              f"best {ranking[0][1]} {ranking[0][3]} grouped={ranking[0][2]}: {ranking[0][0]}")
+
+        if evals >= max_evals or len(candidates) == 1:
+            return ranking
+
+        candidates = [candidate[1:] for candidate in ranking[:max(1, math.ceil(len(ranking) / eta))]]
+        evals = min(evals * eta, max_evals)
+        stage += 1
+
+
+if __name__ == "__main__":
+    dataset_name = "lbnl_fdd"
+    algo_names = ["DE", "GWO", "HHO", "BAT", "SCA"]
+
+    service = MiningService(shared=[dataset_name])
+    try:
+        ranking = successive_halving(service, dataset_name, algo_names, min_evals=2000, max_evals=50000)
+    finally:
+        service.shutdown()
+
+    for score, algo_name, grouped, params in ranking:
+        print(f"{score:.4f} {algo_name} grouped={grouped} {params}")
@@ -0,0 +1,60 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from niapy.callbacks import Callback
+
+from conftest import DATASETS
+from utils.Loader import Dataset
+from utils.Mine import get_rules
+from NARM_grouped import METRICS, make_algorithm
+
+SEEDS = range(1, 7)
+
+
+@pytest.fixture(scope="module")
+def lbnl_fdd():
+    transactions = pd.read_csv(os.path.join(DATASETS, "lbnl_fdd.csv"))
+    with open(os.path.join(DATASETS, "lbnl_fdd_groups.json")) as f:
+        groups = json.load(f)
+    return Dataset(transactions), groups
+
+
+class IterationCounter(Callback):
+
+    def __init__(self):
+        super().__init__()
+        self.before = 0
+        self.after = 0
+
+    def before_iteration(self, population, fitness, best_x, best_fitness, **params):
+        self.before += 1
+
+    def after_iteration(self, population, fitness, best_x, best_fitness, **params):
+        self.after += 1
+
+
+def mine(dataset, groups, algo_name, seed, **kwargs):
+    counter = IterationCounter()
+    algorithm = make_algorithm(algo_name, True, seed=seed)
+    algorithm.callbacks.append(counter)
+    rules = get_rules(dataset, algorithm, groups, METRICS, max_evals=3000, **kwargs).rules
+    best = max((rule.fitness for rule in rules), default=0.0)
+    return len(rules), best, counter
+
+
+@pytest.mark.parametrize("algo_name", ["GWO", "BAT"])
+def test_steady_state_quality_matches_generational(lbnl_fdd, algo_name):
+    dataset, groups = lbnl_fdd
+    generational = [mine(dataset, groups, algo_name, seed) for seed in SEEDS]
+    steady_state = [mine(dataset, groups, algo_name, seed, workers=2) for seed in SEEDS]
+
+    # means over several seeds, a single run of either mode may find no rule at all
+    assert np.mean([run[1] for run in steady_state]) >= 0.7 * np.mean([run[1] for run in generational])
+    assert np.mean([run[0] for run in steady_state]) >= 0.5 * np.mean([run[0] for run in generational])
+    # one iteration per generation, as in the generational loop
+    for (_, _, counter), (_, _, reference) in zip(steady_state, generational):
+        assert counter.before == counter.after
+        assert counter.after == pytest.approx(reference.after, abs=2)
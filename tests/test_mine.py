@@ -0,0 +1,42 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATASETS
+from utils.Loader import Dataset
+from utils.Mine import get_rules
+from NARM_grouped import METRICS, make_algorithm
+
+
+@pytest.fixture(scope="module")
+def lbnl_fdd():
+    transactions = pd.read_csv(os.path.join(DATASETS, "lbnl_fdd.csv"))
+    with open(os.path.join(DATASETS, "lbnl_fdd_groups.json")) as f:
+        groups = json.load(f)
+    return Dataset(transactions), groups
+
+
+@pytest.mark.parametrize("memory_limit", [None, 4000])
+def test_algorithm_by_name(lbnl_fdd, memory_limit):
+    dataset, groups = lbnl_fdd
+    result = get_rules(dataset, "GreyWolfOptimizer", groups, METRICS, max_evals=300, seed=1,
+                       memory_limit=memory_limit, population_size=20)
+    assert result.run_time > 0
+
+
+def test_algorithm_by_name_has_no_workers(lbnl_fdd):
+    dataset, groups = lbnl_fdd
+    with pytest.raises(ValueError):
+        get_rules(dataset, "GreyWolfOptimizer", groups, METRICS, max_evals=300, workers=2)
+
+
+def test_memory_limit_restores_algorithm(lbnl_fdd):
+    dataset, groups = lbnl_fdd
+    algorithm = make_algorithm("GWO", True, seed=1)
+    callbacks = list(algorithm.callbacks.callbacks)
+    get_rules(dataset, algorithm, groups, METRICS, max_evals=300, memory_limit=4000)
+    assert algorithm.dtype == np.float64
+    assert algorithm.callbacks.callbacks == callbacks
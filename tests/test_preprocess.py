@@ -0,0 +1,64 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATASETS
+from utils.Loader import Dataset
+from utils.Mine import get_rules
+from utils.Preprocess import prune_columns, reattach_features
+from NARM_grouped import METRICS, make_algorithm
+from niaarm.rule import Rule
+
+COMPARED = ("support", "confidence", "lift", "coverage", "rhs_support", "inclusion", "amplitude", "comprehensibility")
+
+
+@pytest.fixture(scope="module")
+def lbnl_fdd():
+    transactions = pd.read_csv(os.path.join(DATASETS, "lbnl_fdd.csv"))
+    with open(os.path.join(DATASETS, "lbnl_fdd_groups.json")) as f:
+        groups = json.load(f)
+    return transactions, groups
+
+
+def test_reattached_metrics_match_unpruned_dataset(lbnl_fdd):
+    transactions, groups = lbnl_fdd
+    pruned, pruned_groups, pruning = prune_columns(transactions, groups)
+    assert pruning.constants or pruning.duplicates
+
+    algorithm = make_algorithm("GWO", True, seed=1)
+    rules = get_rules(Dataset(pruned), algorithm, pruned_groups, METRICS, max_evals=1000, logging=False,
+                      grouping=True, seed=1).rules
+    rules = reattach_features(rules, pruning)
+
+    assert len(rules) > 0
+    assert any(len(rule.antecedent) + len(rule.consequent) > 2 for rule in rules)
+    for rule in rules:
+        expected = Rule(rule.antecedent, rule.consequent, transactions=transactions)
+        for metric in COMPARED:
+            assert math.isclose(getattr(rule, metric), getattr(expected, metric), rel_tol=1e-9, abs_tol=1e-12), metric
+
+
+def test_missing_constants_are_not_reattached():
+    rng = np.random.default_rng(0)
+    transactions = pd.DataFrame({
+        "a": rng.normal(size=50),
+        "a_copy": None,
+        "b": np.full(50, 2.0),
+        "empty": np.full(50, np.nan),
+    })
+    transactions["a_copy"] = transactions["a"]
+    groups = [{"a": "numerical", "a_copy": "numerical", "b": "numerical", "empty": "numerical"}]
+
+    pruned, pruned_groups, pruning = prune_columns(transactions, groups)
+    assert list(pruned.columns) == ["a"]
+    assert pruning.constants["empty"] is None
+
+    features = Dataset(pruned).features
+    rules = reattach_features([Rule([features[0]], [features[0]])], pruning)
+    names = [feature.name for feature in rules[0].antecedent]
+    assert names == ["a", "a_copy", "b"]
+    assert rules[0].inclusion == 6 / 4
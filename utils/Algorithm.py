@@ -1,6 +1,9 @@
+import copy
 import logging
 import multiprocessing
 import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 import numpy as np
 from numpy.random import default_rng
@@ -8,13 +11,14 @@ from numpy.random import default_rng
 from niapy.util.array import objects_to_array
 from niapy.callbacks import CallbackList
 
-def default_numpy_init(task, population_size, rng, grouping=True, **_kwargs):
+def default_numpy_init(task, population_size, rng, grouping=True, dtype=np.float64, **_kwargs):
     r"""Initialize starting population that is represented with `numpy.ndarray` with shape `(population_size, task.dimension)`.
 
     Args:
         task (Task): Optimization task.
         population_size (int): Number of individuals in population.
         rng (numpy.random.Generator): Random number generator.
+        dtype (numpy.dtype): Floating point type of the population.
 
     Returns:
         Tuple[numpy.ndarray, numpy.ndarray[float]]:
@@ -22,11 +26,22 @@ def default_numpy_init(task, population_size, rng, grouping=True, **_kwargs):
             2. New population function/fitness values.
 
     """
-    pop = rng.uniform(task.lower, task.upper, (population_size, task.dimension))
+    # drawn one individual at a time, so a narrower dtype never holds a float64 copy of the population,
+    # the random numbers are the same as drawing the whole population at once
+    pop = np.empty((population_size, task.dimension), dtype=dtype)
+    for individual in pop:
+        individual[:] = rng.uniform(task.lower, task.upper, task.dimension)
+
+    if grouping and getattr(task.repair_function, 'grouping', False):
+        # every candidate is repaired during the run, so skip evaluating the unrepaired population
+        new_pop = task.problem.initial_population_grouping_np(pop, copy=False)
+        return new_pop, np.apply_along_axis(task.eval, 1, new_pop)
+
     fpop = np.apply_along_axis(task.eval, 1, pop)
 
     if grouping:
-        new_pop = task.problem.initial_population_grouping_np(pop)
+        # the unrepaired population is not returned, so it is repaired in place
+        new_pop = task.problem.initial_population_grouping_np(pop, copy=False)
 
         new_f_pop = np.apply_along_axis(task.eval, 1, new_pop)
 
@@ -35,7 +50,27 @@ def default_numpy_init(task, population_size, rng, grouping=True, **_kwargs):
         return pop, fpop
 
 
-def default_individual_init(task, population_size, rng, individual_type=None, grouping=True, **_kwargs):
+def grouping_repair(repair_function, problem):
+    r"""Extend a repair function with the grouping repair of the problem.
+
+    Args:
+        repair_function (Callable[[numpy.ndarray, numpy.ndarray, numpy.ndarray, Dict[str, Any]], numpy.ndarray]):
+            Repair function of the task, e.g. :func:`niapy.util.repair.limit`.
+        problem (NiaARM): Problem providing ``repair_grouping``.
+
+    Returns:
+        Callable[[numpy.ndarray, numpy.ndarray, numpy.ndarray, Dict[str, Any]], numpy.ndarray]: The extended repair function.
+
+    """
+    def repair(x, lower, upper, **kwargs):
+        return problem.repair_grouping(repair_function(x, lower, upper, **kwargs))
+
+    repair.grouping = True
+    return repair
+
+
+def default_individual_init(task, population_size, rng, individual_type=None, grouping=True, dtype=np.float64,
+                            **_kwargs):
     r"""Initialize `population_size` individuals of type `individual_type`.
 
     Args:
@@ -43,6 +78,7 @@ def default_individual_init(task, population_size, rng, individual_type=None, gr
         population_size (int): Number of individuals in population.
         rng (numpy.random.Generator): Random number generator.
         individual_type (Optional[Individual]): Class of individual in population.
+        dtype (numpy.dtype): Floating point type of the individuals' components.
 
     Returns:
         Tuple[numpy.ndarray[Individual], numpy.ndarray[float]:
@@ -50,7 +86,7 @@ def default_individual_init(task, population_size, rng, individual_type=None, gr
             2. Initialized individuals function/fitness values.
 
     """
-    pop = objects_to_array([individual_type(task=task, rng=rng, e=True) for _ in range(population_size)])
+    pop = objects_to_array([_new_individual(task, rng, individual_type, dtype) for _ in range(population_size)])
     fitness = np.asarray([x.f for x in pop])
 
     if grouping:
@@ -68,6 +104,67 @@ def default_individual_init(task, population_size, rng, individual_type=None, gr
         return pop, fitness
 
 
+def _new_individual(task, rng, individual_type, dtype):
+    # the same as individual_type(task=task, rng=rng, e=True), with the components cast before evaluation
+    individual = individual_type(task=task, rng=rng, e=False)
+    individual.x = individual.x.astype(dtype, copy=False)
+    individual.evaluate(task, rng)
+    return individual
+
+
+class CandidateRecorder:
+    r"""Stand-in for a task that records the candidates an algorithm wants evaluated.
+
+    Every candidate passed to :meth:`eval` is stored and gets the worst possible fitness, so
+    greedy algorithms do not adopt it, all other attributes are those of the wrapped task.
+
+    Attributes:
+        candidates (list[numpy.ndarray]): Recorded candidates in the order they were generated.
+
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.candidates = []
+
+    def __getattr__(self, name):
+        return getattr(self.task, name)
+
+    def eval(self, x):
+        self.candidates.append(np.array(x, dtype=float, copy=True))
+        return np.inf
+
+
+# Problem copy of each evaluation worker, with its own rule archive
+_worker = threading.local()
+
+
+def _init_eval_worker(problem):
+    # caches of the problem are not synchronised, so every worker thread or process gets its own
+    _worker.problem = problem.worker_copy() if hasattr(problem, 'worker_copy') else copy.copy(problem)
+
+
+def _eval_candidate(x):
+    r"""Evaluate a candidate in a worker and return its value, the rules it added to the archive and its counters."""
+    problem = _worker.problem
+    problem.rules = type(problem.rules)()
+    value = problem.evaluate(x)
+    # phase times and cache counters of the evaluation, added to the problem of the main process
+    counters = problem.take_counters() if hasattr(problem, 'take_counters') else None
+    return value, list(problem.rules), counters
+
+
+def _record_eval(task, value):
+    r"""Count an evaluation done outside of ``task.eval`` with the same bookkeeping as ``task.eval``."""
+    task.evals += 1
+    x_f = value * task.optimization_type.value
+    if x_f < task.x_f * task.optimization_type.value:
+        task.x_f = x_f * task.optimization_type.value
+        task.n_evals.append(task.evals)
+        task.fitness_evals.append(x_f)
+    return x_f
+
+
 class Algorithm:
     r"""Class for implementing algorithms.
 
@@ -87,13 +184,16 @@ class Algorithm:
         initialization_function (Callable[[int, Task, numpy.random.Generator, Dict[str, Any]], Tuple[numpy.ndarray, numpy.ndarray[float]]]):
             Population initialization function.
         individual_type (Optional[Type[Individual]]): Type of individuals used in population, default value is None for Numpy arrays.
+        grouping (bool): Repair the initial population so groups of features are selected together.
+        repair_groups (bool): With ``grouping``, also repair every candidate the algorithm generates during the run.
+        dtype (numpy.dtype): Floating point type of the population, ``numpy.float32`` halves its memory.
 
     """
 
     Name = ['Algorithm', 'AAA']
 
     def __init__(self, population_size=50, initialization_function=default_numpy_init, individual_type=None,
-                 callbacks=None, seed=None, grouping=True, *args, **kwargs):
+                 callbacks=None, seed=None, grouping=True, repair_groups=False, dtype=np.float64, *args, **kwargs):
         r"""Initialize algorithm and create name for an algorithm.
 
         Args:
@@ -103,6 +203,9 @@ class Algorithm:
             individual_type (Optional[Type[Individual]]): Individual type used in population, default is Numpy array.
             callbacks (Optional[Union[list[Callback], CallbackList]]): List of callbacks to apply before and after each iteration.
             seed (Optional[int]): Starting seed for random generator.
+            grouping (Optional[bool]): Repair the initial population so groups of features are selected together.
+            repair_groups (Optional[bool]): With ``grouping``, also repair every candidate passed to ``task.repair``.
+            dtype (Optional[numpy.dtype]): Floating point type of the population. Default: ``numpy.float64``.
 
         See Also:
             * :func:`niapy.algorithms.Algorithm.set_parameters`
@@ -115,6 +218,8 @@ class Algorithm:
         self.callbacks.set_algorithm(self)
         self.rng = default_rng(seed)
         self.grouping = grouping
+        self.repair_groups = repair_groups
+        self.dtype = dtype
         self.exception = None
 
     @staticmethod
@@ -270,7 +375,8 @@ class Algorithm:
 
         """
         pop, fpop = self.initialization_function(task=task, population_size=self.population_size, rng=self.rng,
-                                                 individual_type=self.individual_type, grouping=self.grouping)
+                                                 individual_type=self.individual_type, grouping=self.grouping,
+                                                 dtype=self.dtype)
         return pop, fpop, {}
 
     def run_iteration(self, task, population, population_fitness, best_x, best_fitness, **params):
@@ -300,6 +406,35 @@ class Algorithm:
         """
         return population, population_fitness, best_x, best_fitness, params
 
+    def update_params(self, population, population_fitness, params):
+        r"""Rebuild the additional arguments that depend on the fitness of the population.
+
+        Called by :meth:`run_steady_state` before every generation. Candidates are generated on a task that
+        records them without evaluating, so :meth:`run_iteration` cannot update this state from their fitness
+        itself. The population holds the evaluated candidates folded back so far.
+
+        Args:
+            population (numpy.ndarray): Current population.
+            population_fitness (numpy.ndarray): Current population fitness values.
+            params (Dict[str, Any]): Additional arguments, as returned by the last :meth:`run_iteration`.
+
+        Returns:
+            Dict[str, Any]: Additional arguments for the next :meth:`run_iteration`.
+
+        """
+        return params
+
+    def init_repair(self, task):
+        r"""Extend the task's repair function with the grouping repair if ``repair_groups`` is enabled.
+
+        Args:
+            task (Task): Optimization task.
+
+        """
+        if self.grouping and self.repair_groups and not getattr(task.repair_function, 'grouping', False):
+            # every algorithm passes its new candidates through task.repair
+            task.repair_function = grouping_repair(task.repair_function, task.problem)
+
     def run(self, task):
         r"""Start the optimization.
 
@@ -316,6 +451,7 @@ class Algorithm:
 
         """
         try:
+            self.init_repair(task)
             self.callbacks.before_run()
             pop, fpop, params = self.init_population(task)
             xb, fxb = self.get_best(pop, fpop)
@@ -332,6 +468,106 @@ class Algorithm:
             self.exception = e
             return None, None
 
+    def run_steady_state(self, task, workers=None, use_processes=False):
+        r"""Start the optimization in asynchronous steady-state mode.
+
+        Candidates are evaluated by a pool of workers and folded back as soon as they finish: a finished
+        candidate replaces the worst individual if it is at least as good, one of them at random if several
+        are equally bad. ``2 * workers`` candidates are kept
+        running, so workers stay busy when rule evaluation times differ. They are taken from a queue holding
+        one generation: once it is empty, :meth:`update_params` rebuilds the fitness dependent state from the
+        current population and the algorithm's own :meth:`run_iteration` generates the next generation from
+        a snapshot of it. Generations therefore come from the latest population, and state advanced once per
+        :meth:`run_iteration`, like a loudness or velocities, advances at the pace of the generational loop.
+
+        Every generation is one iteration: ``before_iteration`` is called when it is generated and
+        ``after_iteration`` once all its candidates are folded back, in generation order. Exactly
+        ``task.max_evals`` evaluations are made, rules found by the workers are merged into the problem's
+        archive in the main process, as are their phase times and cache counters if the problem keeps them.
+
+        Args:
+            task (Task): Optimization task.
+            workers (Optional[int]): Number of evaluation workers. Default: number of CPUs.
+            use_processes (bool): Evaluate in processes instead of threads.
+
+        Returns:
+            Tuple[numpy.ndarray, float]:
+                1. Best individuals components found in optimization process.
+                2. Best fitness value found in optimization process.
+
+        """
+        workers = workers or multiprocessing.cpu_count()
+        pool_type = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        problem = task.problem
+        try:
+            self.init_repair(task)
+            self.callbacks.before_run()
+            pop, fpop, params = self.init_population(task)
+            fpop = np.asarray(fpop, dtype=float)
+            xb, fxb = self.get_best(pop, fpop)
+
+            with pool_type(max_workers=workers, initializer=_init_eval_worker, initargs=(problem,)) as pool:
+                pending = set()
+                # candidates not folded back yet of every open iteration, oldest first
+                iterations = deque()
+                # candidates of the latest generation not submitted yet
+                queue = deque()
+                submitted = 0
+                while True:
+                    budget = task.max_evals - task.evals - len(pending) - len(queue)
+                    if not queue and budget > 0 and task.iters + len(iterations) < task.max_iters:
+                        params = self.update_params(pop, fpop, params)
+                        self.callbacks.before_iteration(pop, fpop, xb, fxb, **params)
+                        recorder = CandidateRecorder(task)
+                        *_, params = self.run_iteration(recorder, pop.copy(), fpop.copy(), xb, fxb, **params)
+                        candidates = recorder.candidates[:budget]
+                        iteration = [len(candidates)]
+                        iterations.append(iteration)
+                        queue.extend((x, iteration) for x in candidates)
+                    while queue and len(pending) < 2 * workers:
+                        x, iteration = queue.popleft()
+                        future = pool.submit(_eval_candidate, x)
+                        future.x = x
+                        future.iteration = iteration
+                        future.order = submitted
+                        submitted += 1
+                        pending.add(future)
+                    while iterations and iterations[0][0] == 0:
+                        iterations.popleft()
+                        self.callbacks.after_iteration(pop, fpop, xb, fxb, **params)
+                        task.next_iter()
+                    if not pending:
+                        break
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    # folded in submission order, the order of a set of futures changes from run to run
+                    for future in sorted(done, key=lambda future: future.order):
+                        future.iteration[0] -= 1
+                        value, rules, counters = future.result()
+                        for rule in rules:
+                            if rule not in problem.rules:
+                                problem.rules.append(rule)
+                        if counters is not None:
+                            problem.add_counters(counters)
+                        f = _record_eval(task, value)
+                        # ties replace a random worst individual, so a population without any rule keeps moving
+                        worst = self.rng.choice(np.flatnonzero(fpop == fpop.max()))
+                        if f <= fpop[worst]:
+                            if self.individual_type is not None:
+                                pop[worst] = self.individual_type(x=future.x, e=False)
+                                pop[worst].f = f
+                            else:
+                                pop[worst] = future.x
+                            fpop[worst] = f
+                            xb, fxb = self.get_best(pop[worst], f, xb, fxb)
+            self.callbacks.after_run()
+            return xb, fxb * task.optimization_type.value
+        except BaseException as e:
+            if threading.current_thread() is threading.main_thread() and multiprocessing.current_process().name == 'MainProcess':
+                raise e
+            self.exception = e
+            return None, None
+
     def bad_run(self):
         r"""Check if some exceptions where thrown when the algorithm was running.
 
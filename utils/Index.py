@@ -0,0 +1,404 @@
+import copy
+
+import numpy as np
+
+from niaarm.feature import Feature
+from niaarm.rule import Rule
+
+BINNINGS = ("frequency", "width")
+
+# Caches with hit and miss counters
+CACHES = ("range", "prefix", "mask")
+
+
+def row_dtype(num_transactions):
+    r"""Integer type of the row indices of ``num_transactions`` rows."""
+    return np.int32 if num_transactions < 2 ** 31 else np.int64
+
+
+def sort_column(values):
+    r"""Sort order of a column and its sorted values, as kept by :class:`TransactionIndex`.
+
+    Args:
+        values (numpy.ndarray): Values of a numeric column or codes of a categorical column.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: Row indices in stable sort order and the sorted values.
+
+    """
+    order = np.argsort(values, kind="stable").astype(row_dtype(len(values)), copy=False)
+    return order, values[order]
+
+
+class TransactionIndex:
+    r"""Sorted per-column index of a transaction database.
+
+    Every column is argsorted once, numeric columns by value and categorical columns by
+    category code. The rows inside an interval ``[min_val, max_val]``, or the rows holding a
+    category, are then a contiguous range of the sort order, found with two ``searchsorted``
+    calls instead of comparing every row.
+
+    The rows satisfying a set of features are found vertically. The row set of the most selective
+    feature is filtered by the others in ascending order of selectivity, and the work stops as soon as
+    no row is left.
+
+    Rules are evaluated incrementally. The row range of every feature is cached by its borders or
+    category, which repeat exactly for every gene a move leaves unchanged, and every intermediate row
+    set of :meth:`rule` is kept in a prefix tree keyed by the row ranges, so a rule that shares its most
+    selective features with an earlier rule only filters by the features that changed.
+
+    With ``bins``, every numeric column is also split into bins of equal frequency or equal width,
+    each with a precomputed bitmap of its rows. Intervals are snapped outwards to whole bins by
+    :meth:`snap`, so the mask of an interval is an OR over a contiguous range of bitmaps and is
+    cached, since the same bin ranges recur throughout a run.
+
+    Args:
+        transactions (pandas.DataFrame): The dataset's transactions.
+        features (list[Feature]): Features to index.
+        bins (Optional[int]): Number of bins per numeric column. Default: ``None``, no binning.
+        binning (str): ``frequency`` for bins holding equally many rows, ``width`` for bins of equal width.
+         Default: ``frequency``.
+        cache_size (int): Maximum number of cached bin range masks. Default: ``4096``.
+        prefix_cache_rows (int): Maximum number of row indices kept in the prefix tree, it is cleared
+         when full. Default: ``2 ** 22``.
+        range_cache_size (int): Maximum number of cached feature row ranges, the cache is cleared when full.
+         Default: ``2 ** 16``.
+        sorted_columns (Optional[dict[str, Tuple[numpy.ndarray, numpy.ndarray]]]): Precomputed :func:`sort_column`
+         of columns by name, e.g. views of shared memory from :func:`utils.SharedStore.attach`, which are used
+         instead of sorting a private copy. Default: ``None``, every column is sorted here.
+
+    Attributes:
+        num_transactions (int): Number of transactions.
+        num_columns (int): Number of columns of the transactions.
+        row_itemsize (int): Bytes per row index of the sort orders and row sets.
+        hits (dict[str, int]): Lookups answered by the ``range``, ``prefix`` and ``mask`` caches.
+        misses (dict[str, int]): Lookups the caches could not answer.
+
+    """
+
+    def __init__(self, transactions, features, bins=None, binning="frequency", cache_size=4096,
+                 prefix_cache_rows=2 ** 22, range_cache_size=2 ** 16, sorted_columns=None):
+        if binning not in BINNINGS:
+            raise ValueError(f"Invalid binning: {binning}")
+
+        self.num_transactions = len(transactions)
+        self.num_columns = len(transactions.columns)
+        # row sets of the prefix tree are slices of the sort orders, so they share their dtype
+        self.row_itemsize = np.dtype(row_dtype(self.num_transactions)).itemsize
+        self.position = {}
+        self.values = []
+        self.orders = []
+        self.sorted_values = []
+        self.category_codes = []
+        self.ranges = []
+        self.bin_lows = []
+        self.bin_highs = []
+        self.bitmaps = []
+        self.cache = {}
+        self.cache_size = cache_size
+        self.prefix_tree = {}
+        self.prefix_rows = 0
+        self.prefix_cache_rows = prefix_cache_rows
+        self.feature_ranges = {}
+        self.range_cache_size = range_cache_size
+        # plain counters, read without locking by utils.Monitor
+        self.hits = dict.fromkeys(CACHES, 0)
+        self.misses = dict.fromkeys(CACHES, 0)
+
+        sorted_columns = sorted_columns or {}
+        for i, feature in enumerate(features):
+            column = transactions[feature.name]
+            if feature.dtype == "cat":
+                values = column.cat.codes.to_numpy()
+                codes = {category: code for code, category in enumerate(column.cat.categories)}
+                value_range = None
+            else:
+                values = column.to_numpy()
+                codes = None
+                value_range = (column.min(), column.max())
+
+            if feature.name in sorted_columns:
+                order, sorted_values = sorted_columns[feature.name]
+            else:
+                order, sorted_values = sort_column(values)
+            self.position[feature.name] = i
+            self.values.append(values)
+            self.orders.append(order)
+            self.sorted_values.append(sorted_values)
+            self.category_codes.append(codes)
+            self.ranges.append(value_range)
+
+            if bins and feature.dtype != "cat":
+                self._add_bins(feature, sorted_values, order, bins, binning)
+            else:
+                self.bin_lows.append(None)
+                self.bin_highs.append(None)
+                self.bitmaps.append(None)
+
+    def _add_bins(self, feature, sorted_values, order, bins, binning):
+        valid = sorted_values[:np.searchsorted(sorted_values, np.nan) if sorted_values.dtype.kind == "f" else None]
+        if len(valid) == 0:
+            # a column without values has no bins, so no interval is snapped
+            self.bin_lows.append(valid)
+            self.bin_highs.append(valid)
+            self.bitmaps.append(np.zeros((0, (self.num_transactions + 7) // 8), dtype=np.uint8))
+            return
+
+        if binning == "frequency":
+            edges = np.quantile(valid, np.linspace(0, 1, bins + 1))
+        else:
+            edges = np.linspace(valid[0], valid[-1], bins + 1)
+        # bins start at a change of value, so equal values never end up in different bins
+        edges = np.array(np.unique(np.searchsorted(valid, edges[:-1], "left")).tolist() + [len(valid)])
+
+        self.bin_lows.append(valid[edges[:-1]])
+        self.bin_highs.append(valid[edges[1:] - 1])
+        bitmaps = np.zeros((len(edges) - 1, self.num_transactions), dtype=bool)
+        for b in range(len(edges) - 1):
+            bitmaps[b, order[edges[b]:edges[b + 1]]] = True
+        self.bitmaps.append(np.packbits(bitmaps, axis=1))
+
+    def snap(self, feature):
+        r"""Widen the interval of a numeric feature to the bins it overlaps.
+
+        The borders of the snapped feature are the lowest and highest value of those bins, so it covers
+        exactly the rows of the bins.
+
+        Args:
+            feature (Feature): An attribute of a rule.
+
+        Returns:
+            Feature: The snapped feature, or ``feature`` if its column is not binned, has no bins because all its
+            values are missing, or no bin overlaps it.
+
+        """
+        i = self.position[feature.name]
+        if self.bitmaps[i] is None:
+            return feature
+        lo, hi = self.bin_range(i, feature)
+        if lo > hi:
+            return feature
+        return Feature(feature.name, feature.dtype, self.bin_lows[i][lo].item(), self.bin_highs[i][hi].item())
+
+    def bin_range(self, i, feature):
+        r"""First and last bin of column ``i`` overlapping the interval of ``feature``."""
+        return (
+            np.searchsorted(self.bin_highs[i], feature.min_val, "left"),
+            np.searchsorted(self.bin_lows[i], feature.max_val, "right") - 1,
+        )
+
+    def clear_caches(self):
+        r"""Drop the cached bin masks, feature row ranges and the prefix tree."""
+        self.cache = {}
+        self.feature_ranges = {}
+        self.prefix_tree = {}
+        self.prefix_rows = 0
+
+    def worker_copy(self):
+        r"""Copy sharing the sorted columns and bitmaps, with empty caches of its own.
+
+        The caches and counters are not synchronised, so every thread evaluating rules concurrently needs
+        its own copy.
+        """
+        index = copy.copy(self)
+        index.clear_caches()
+        index.hits = dict.fromkeys(CACHES, 0)
+        index.misses = dict.fromkeys(CACHES, 0)
+        return index
+
+    def row_range(self, feature):
+        r"""Range of the sort order of a column holding the rows that satisfy ``feature``.
+
+        Args:
+            feature (Feature): An attribute of a rule, an interval or a single category.
+
+        Returns:
+            Tuple[int, int, int]: Column position, start and end of the range.
+
+        """
+        if feature.dtype == "cat":
+            key = (feature.name, feature.categories[0])
+        else:
+            key = (feature.name, feature.min_val, feature.max_val)
+        row_range = self.feature_ranges.get(key)
+        if row_range is not None:
+            self.hits["range"] += 1
+            return row_range
+        self.misses["range"] += 1
+
+        i = self.position[feature.name]
+        sorted_values = self.sorted_values[i]
+        if feature.dtype == "cat":
+            code = self._category_code(i, feature)
+            row_range = (i, int(sorted_values.searchsorted(code, "left")), int(sorted_values.searchsorted(code, "right")))
+        else:
+            row_range = (
+                i,
+                int(sorted_values.searchsorted(feature.min_val, "left")),
+                int(sorted_values.searchsorted(feature.max_val, "right")),
+            )
+
+        if len(self.feature_ranges) >= self.range_cache_size:
+            self.feature_ranges = {}
+        self.feature_ranges[key] = row_range
+        return row_range
+
+    def _category_code(self, i, feature):
+        # -2 is neither a category nor a missing value
+        return self.category_codes[i].get(feature.categories[0], -2)
+
+    def rows(self, feature):
+        r"""Indices of the rows that satisfy ``feature``, in sort order of the column."""
+        i, lo, hi = self.row_range(feature)
+        return self.orders[i][lo:hi]
+
+    def mask(self, feature):
+        r"""Boolean mask of the rows that satisfy ``feature``."""
+        i = self.position[feature.name]
+        bins = self._covers_bins(i, feature)
+        if bins is not None:
+            return self._bin_mask(i, *bins)
+
+        mask = np.zeros(self.num_transactions, dtype=bool)
+        mask[self.rows(feature)] = True
+        return mask
+
+    def _covers_bins(self, i, feature):
+        # bin range of a feature snapped by :meth:`snap`, or None
+        if self.bitmaps[i] is None:
+            return None
+        lo, hi = self.bin_range(i, feature)
+        if lo <= hi and feature.min_val <= self.bin_lows[i][lo] and feature.max_val >= self.bin_highs[i][hi]:
+            return lo, hi
+        return None
+
+    def _bin_mask(self, i, lo, hi):
+        key = (i, lo, hi)
+        mask = self.cache.get(key)
+        if mask is not None:
+            self.hits["mask"] += 1
+        else:
+            self.misses["mask"] += 1
+            bitmap = np.bitwise_or.reduce(self.bitmaps[i][lo:hi + 1], axis=0)
+            mask = np.unpackbits(bitmap, count=self.num_transactions).view(bool)
+            mask.flags.writeable = False
+            if len(self.cache) >= self.cache_size:
+                del self.cache[next(iter(self.cache))]
+            self.cache[key] = mask
+        return mask
+
+    def contains(self, feature, rows):
+        r"""Which of the given rows satisfy ``feature``.
+
+        Args:
+            feature (Feature): An attribute of a rule.
+            rows (numpy.ndarray): Row indices.
+
+        Returns:
+            numpy.ndarray: Boolean array of the same length as ``rows``.
+
+        """
+        i = self.position[feature.name]
+        bins = self._covers_bins(i, feature)
+        if bins is not None:
+            return self._bin_mask(i, *bins)[rows]
+
+        values = self.values[i][rows]
+        if feature.dtype == "cat":
+            return values == self._category_code(i, feature)
+        return (values >= feature.min_val) & (values <= feature.max_val)
+
+    def by_selectivity(self, features):
+        r"""Sort features by the number of rows they hold, fewest first.
+
+        Returns:
+            list[Tuple[Tuple[int, int, int], Feature]]: Row range of the feature, see :meth:`row_range`, and feature.
+
+        """
+        ranges = [self.row_range(feature) for feature in features]
+        order = np.argsort([hi - lo for _, lo, hi in ranges], kind="stable")
+        return [(ranges[k], features[k]) for k in order]
+
+    def filter_rows(self, rows, features):
+        r"""Keep the rows that satisfy all ``features``, stop as soon as none is left."""
+        for _, feature in features:
+            if len(rows) == 0:
+                break
+            rows = rows[self.contains(feature, rows)]
+        return rows
+
+    def _walk(self, node, rows, features):
+        # filter rows along a path of the prefix tree, reusing and adding the row sets of its nodes
+        for key, feature in features:
+            if rows is not None and len(rows) == 0:
+                break
+            child = node.get(key)
+            if child is not None:
+                self.hits["prefix"] += 1
+            else:
+                self.misses["prefix"] += 1
+                if rows is None:
+                    rows = self.orders[key[0]][key[1]:key[2]]
+                else:
+                    rows = rows[self.contains(feature, rows)]
+                    self.prefix_rows += len(rows)
+                child = node[key] = (rows, {})
+            rows, node = child
+        return rows, node
+
+    def itemset_rows(self, features):
+        r"""Rows that satisfy all ``features``, see :meth:`by_selectivity` and :meth:`filter_rows`."""
+        if not features:
+            return np.arange(self.num_transactions)
+        features = self.by_selectivity(features)
+        return self.filter_rows(self.rows(features[0][1]), features[1:])
+
+    def amplitude(self, antecedent, consequent):
+        r"""Amplitude of a rule, as computed by :class:`niaarm.rule.Rule`."""
+        acc = 0
+        for feature in antecedent + consequent:
+            if feature.dtype != "cat":
+                feature_min, feature_max = self.ranges[self.position[feature.name]]
+                acc += 1 if feature_max == feature_min \
+                    else (feature.max_val - feature.min_val) / (feature_max - feature_min)
+        return 1 - (1 / (len(antecedent) + len(consequent))) * acc
+
+    def build_rule(self, antecedent, consequent, antecedent_count, consequent_count, full_count):
+        r"""Create a :class:`niaarm.rule.Rule` from the number of rows its antecedent, consequent and both hold.
+
+        The rule holds the same counts and metrics as ``Rule(antecedent, consequent, transactions=...)``,
+        without scanning the transactions again.
+
+        Returns:
+            Rule: The association rule.
+
+        """
+        rule = Rule(antecedent, consequent)
+        rule.num_transactions = self.num_transactions
+        # numpy integers, so metrics with a zero denominator give nan as in niaarm
+        rule.antecedent_count = np.int64(antecedent_count)
+        rule.consequent_count = np.int64(consequent_count)
+        rule.full_count = np.int64(full_count)
+        rule.ant_not_con = rule.antecedent_count - rule.full_count
+        rule.con_not_ant = rule.consequent_count - rule.full_count
+        rule.not_ant_not_con = self.num_transactions - rule.antecedent_count - rule.con_not_ant
+        rule._Rule__inclusion = (len(antecedent) + len(consequent)) / self.num_columns
+        rule._Rule__amplitude = self.amplitude(antecedent, consequent)
+        return rule
+
+    def rule(self, antecedent, consequent):
+        r"""Create a :class:`niaarm.rule.Rule` with its counts computed from the index.
+
+        The rows of the antecedent are filtered further by the consequent, so a rule whose antecedent
+        holds no row costs only the antecedent's most selective features and the consequent count.
+        """
+        if self.prefix_rows > self.prefix_cache_rows:
+            self.prefix_tree = {}
+            self.prefix_rows = 0
+
+        ordered = self.by_selectivity(consequent)
+        antecedent_rows, node = self._walk(self.prefix_tree, None, self.by_selectivity(antecedent))
+        consequent_rows, _ = self._walk(self.prefix_tree, None, ordered)
+        # the antecedent's node continues with the consequent, as its rows satisfy both
+        full_rows, _ = self._walk(node, antecedent_rows, ordered)
+        return self.build_rule(antecedent, consequent, len(antecedent_rows), len(consequent_rows), len(full_rows))
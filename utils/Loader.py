@@ -0,0 +1,149 @@
+import os
+import json
+
+import pandas as pd
+from niaarm.dataset import Dataset
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DATASET_DIR = "/datasets/water pipes"
+
+# Preferred on-disk formats, the first one found next to the groups file is used
+FORMATS = ("parquet", "arrow", "csv")
+
+
+def _require_pyarrow(path):
+    if pa is None:
+        raise ImportError(f"pyarrow is required to read or write {path}")
+
+
+def dataset_path(dataset_name, root=DATASET_DIR, fmt=None):
+    r"""Find the file of a dataset.
+
+    Args:
+        dataset_name (str): Name of the dataset, e.g. ``leakdb``.
+        root (str): Directory containing the datasets.
+        fmt (Optional[str]): Force one of ``FORMATS``. By default the first existing format is used.
+
+    Returns:
+        str: Path to the dataset file.
+
+    """
+    formats = FORMATS if fmt is None else (fmt,)
+    for ext in formats:
+        path = os.path.join(root, f"{dataset_name}.{ext}")
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No {'/'.join(formats)} file for dataset {dataset_name} in {root}")
+
+
+def load_groups(dataset_name, root=DATASET_DIR):
+    r"""Load the grouping data of a dataset from ``<dataset_name>_groups.json``."""
+    with open(os.path.join(root, f"{dataset_name}_groups.json"), "r") as f:
+        return json.load(f)
+
+
+def read_column_names(path):
+    r"""Read the column names of a dataset file without decoding any data.
+
+    Args:
+        path (str): Path to a parquet, arrow or csv file.
+
+    Returns:
+        list[str]: Column names in file order.
+
+    """
+    if path.endswith(".parquet"):
+        _require_pyarrow(path)
+        return pq.read_schema(path).names
+    if path.endswith(".arrow"):
+        _require_pyarrow(path)
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_table(path, columns=None):
+    r"""Read a dataset file, decoding only the requested columns.
+
+    For parquet and arrow files the projection is pushed down to the reader, so columns
+    that are not requested are never decoded. Csv files fall back to ``usecols``, which
+    still has to tokenize every line.
+
+    Args:
+        path (str): Path to a parquet, arrow or csv file.
+        columns (Optional[Iterable[str]]): Columns to read. Default: all columns.
+
+    Returns:
+        pandas.DataFrame: The transactions, with columns in file order.
+
+    """
+    if columns is not None:
+        wanted = set(columns)
+        columns = [col for col in read_column_names(path) if col in wanted]
+
+    if path.endswith(".parquet"):
+        _require_pyarrow(path)
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if path.endswith(".arrow"):
+        _require_pyarrow(path)
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def group_features(groups):
+    r"""Get the features of the given groups in order of first appearance."""
+    features = []
+    seen_features = set()
+    for group in groups:
+        for feature in group.keys():
+            if feature not in seen_features:
+                features.append(feature)
+                seen_features.add(feature)
+    return features
+
+
+def load_dataset(dataset_name, groups=None, root=DATASET_DIR, fmt=None):
+    r"""Load the transactions of a dataset, restricted to the features of ``groups``.
+
+    Args:
+        dataset_name (str): Name of the dataset, e.g. ``leakdb``.
+        groups (Optional[list[dict]]): Groups whose features should be loaded. Default: all columns.
+        root (str): Directory containing the datasets.
+        fmt (Optional[str]): Force one of ``FORMATS``.
+
+    Returns:
+        pandas.DataFrame: The transactions.
+
+    """
+    path = dataset_path(dataset_name, root, fmt)
+    columns = group_features(groups) if groups is not None else None
+    return read_table(path, columns)
+
+
+def convert_csv(csv_path, fmt="parquet"):
+    r"""Convert a csv dataset to parquet or arrow, written next to the csv file.
+
+    Args:
+        csv_path (str): Path to the csv file.
+        fmt (str): Either ``parquet`` or ``arrow``.
+
+    Returns:
+        str: Path of the written file.
+
+    """
+    if fmt not in ("parquet", "arrow"):
+        raise ValueError(f"Invalid format: {fmt}")
+    out_path = os.path.splitext(csv_path)[0] + f".{fmt}"
+    _require_pyarrow(out_path)
+    table = pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False)
+    if fmt == "parquet":
+        pq.write_table(table, out_path)
+    else:
+        feather.write_feather(table, out_path)
+    return out_path
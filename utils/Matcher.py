@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+
+class RuleMatcher:
+    r"""Rules compiled to per-feature bitset tables, to match batches of rows against all rules at once.
+
+    The bounds of all rules on a numeric feature are sorted into boundaries, which split the values
+    into classes: below the first boundary, equal to a boundary, strictly between two boundaries and
+    above the last one. Each categorical feature has a class per category used by the rules and one
+    for every other value. For every class, a bitset over the antecedents and consequents of all
+    rules records which of them the feature allows. Rules that do not use the feature always allow it.
+    Matching a row costs a ``searchsorted`` and an AND of one bitset per feature.
+
+    Args:
+        rules (Sequence[Rule]): Rules to match, e.g. a ``RuleList`` or a :class:`utils.RuleArchive.RuleArchive`.
+
+    Attributes:
+        num_rules (int): Number of rules.
+        confidence (numpy.ndarray): Confidence of every rule, the default weight of :meth:`score`.
+
+    """
+
+    def __init__(self, rules):
+        rules = list(rules)
+        self.num_rules = len(rules)
+        self.confidence = np.array([rule.confidence for rule in rules], dtype=float)
+
+        # bit r is the antecedent of rule r and bit num_rules + r its consequent
+        predicates = {}
+        for r, rule in enumerate(rules):
+            for bit, side in ((r, rule.antecedent), (self.num_rules + r, rule.consequent)):
+                for feature in side:
+                    predicates.setdefault(feature.name, (feature.dtype, []))[1].append((bit, feature))
+
+        self.tables = []
+        for name, (dtype, items) in predicates.items():
+            bits = np.array([bit for bit, _ in items])
+            if dtype == "cat":
+                boundaries = list(dict.fromkeys(feature.categories[0] for _, feature in items))
+                codes = {category: k for k, category in enumerate(boundaries)}
+                allowed = np.zeros((len(boundaries) + 1, len(items)), dtype=bool)
+                allowed[[codes[feature.categories[0]] for _, feature in items], np.arange(len(items))] = True
+            else:
+                lower = np.array([feature.min_val for _, feature in items], dtype=float)
+                upper = np.array([feature.max_val for _, feature in items], dtype=float)
+                boundaries = np.unique(np.concatenate((lower, upper)))
+                # an interval allows the contiguous classes from its lower to its upper boundary
+                first = 2 * np.searchsorted(boundaries, lower) + 1
+                last = 2 * np.searchsorted(boundaries, upper) + 1
+                diff = np.zeros((2 * len(boundaries) + 2, len(items)), dtype=np.int32)
+                diff[first, np.arange(len(items))] = 1
+                diff[last + 1, np.arange(len(items))] = -1
+                allowed = np.cumsum(diff, axis=0)[:-1] > 0
+
+            table = np.ones((len(allowed), 2 * self.num_rules), dtype=bool)
+            table[:, bits] = allowed
+            self.tables.append((name, dtype, boundaries, np.packbits(table, axis=1)))
+
+    def _classes(self, dtype, boundaries, values):
+        if dtype == "cat":
+            codes = pd.Categorical(values, categories=boundaries).codes
+            return np.where(codes < 0, len(boundaries), codes)
+        values = np.asarray(values, dtype=float)
+        positions = np.searchsorted(boundaries, values)
+        equal = boundaries[np.minimum(positions, len(boundaries) - 1)] == values
+        return 2 * positions + equal
+
+    def match(self, rows):
+        r"""Match rows against the antecedent and consequent of every rule.
+
+        Args:
+            rows (pandas.DataFrame): Rows holding every feature used by the rules.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: Boolean arrays of shape ``(len(rows), num_rules)``, whether
+            each row satisfies the antecedent and the consequent of each rule.
+
+        """
+        bits = np.full((len(rows), (2 * self.num_rules + 7) // 8), 255, dtype=np.uint8)
+        for name, dtype, boundaries, table in self.tables:
+            bits &= table[self._classes(dtype, boundaries, rows[name].to_numpy())]
+        matched = np.unpackbits(bits, axis=1, count=2 * self.num_rules).view(bool)
+        return matched[:, :self.num_rules], matched[:, self.num_rules:]
+
+    def violations(self, rows):
+        r"""Rules whose antecedent holds but whose consequent does not, for every row.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape ``(len(rows), num_rules)``.
+
+        """
+        antecedent, consequent = self.match(rows)
+        return antecedent & ~consequent
+
+    def score(self, rows, weights=None, batch_size=4096):
+        r"""Anomaly score of every row, the summed weight of the rules it violates.
+
+        Args:
+            rows (pandas.DataFrame): Rows to score.
+            weights (Optional[numpy.ndarray]): Weight of every rule. Default: the rules' confidence.
+            batch_size (int): Rows matched at once, bounds the memory of the match matrices. Default: ``4096``.
+
+        Returns:
+            numpy.ndarray: Score of every row.
+
+        """
+        weights = self.confidence if weights is None else np.asarray(weights, dtype=float)
+        scores = np.empty(len(rows))
+        for start in range(0, len(rows), batch_size):
+            scores[start:start + batch_size] = self.violations(rows.iloc[start:start + batch_size]) @ weights
+        return scores
@@ -0,0 +1,89 @@
+import os
+import resource
+
+from niapy.callbacks import Callback
+
+# Share of the memory left below the limit that the index caches may fill
+CACHE_SHARE = 0.25
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss():
+    r"""Resident set size of the current process in bytes.
+
+    Note: Read from ``/proc/self/statm`` where available, elsewhere the peak resident set size is used.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def megabytes(limit):
+    r"""Convert a memory limit in megabytes to bytes."""
+    return int(limit * 2 ** 20)
+
+
+def limit_caches(indexes, max_rss, share=CACHE_SHARE):
+    r"""Size the caches of transaction indexes to fit in the memory left below a limit.
+
+    The caches may fill ``share`` of the memory left, split evenly among the indexes. Only the
+    prefix tree grows with the number of transactions, so its row limit is lowered, the other caches
+    hold a bounded number of small entries.
+
+    Args:
+        indexes (Iterable[TransactionIndex]): Indexes built for the run.
+        max_rss (int): Resident set size limit in bytes.
+        share (float): Share of the remaining memory given to the caches. Default: ``0.25``.
+
+    Raises:
+        MemoryError: The process already uses more than ``max_rss``.
+
+    """
+    indexes = list(indexes)
+    headroom = max_rss - rss()
+    if headroom <= 0:
+        raise MemoryError(f"The dataset and its index already use more than the memory limit of {max_rss} bytes")
+
+    budget = int(headroom * share) // len(indexes)
+    for index in indexes:
+        index.prefix_cache_rows = min(index.prefix_cache_rows, budget // index.row_itemsize)
+
+
+class MemoryLimit(Callback):
+    r"""Keep the resident set size of a run below a limit.
+
+    After every iteration, the resident set size is compared with the limit. Above it, the caches of
+    the problem's indexes are dropped, and if that does not free enough memory the run is stopped with
+    a ``MemoryError``.
+
+    Args:
+        problem (NiaARM): Problem of the run.
+        max_rss (int): Resident set size limit in bytes.
+
+    Attributes:
+        peak (int): Highest resident set size seen after an iteration.
+
+    """
+
+    def __init__(self, problem, max_rss):
+        super().__init__()
+        self.problem = problem
+        self.max_rss = max_rss
+        self.peak = 0
+
+    def before_run(self):
+        self.peak = rss()
+
+    def after_iteration(self, population, fitness, best_x, best_fitness, **params):
+        current = rss()
+        if current > self.max_rss:
+            self.problem.clear_caches()
+            current = rss()
+            if current > self.max_rss:
+                raise MemoryError(f"Resident set size of {current} bytes exceeds the limit of {self.max_rss} bytes "
+                                  f"with {len(self.problem.rules)} rules in the archive")
+        self.peak = max(self.peak, current)
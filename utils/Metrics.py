@@ -0,0 +1,211 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# added to denominators as in niaarm
+EPSILON = 2.220446049250313e-16
+
+
+class Contingency(namedtuple("Contingency", ("full", "antecedent", "consequent", "num_transactions",
+                                             "antecedent_size", "consequent_size", "inclusion", "amplitude"))):
+    """Contingency counts of a batch of rules as a ``namedtuple`` of arrays.
+
+    Attributes:
+        full (numpy.ndarray): Number of transactions containing the antecedent and the consequent.
+        antecedent (numpy.ndarray): Number of transactions containing the antecedent.
+        consequent (numpy.ndarray): Number of transactions containing the consequent.
+        num_transactions (numpy.ndarray): Number of transactions.
+        antecedent_size (numpy.ndarray): Number of features in the antecedent.
+        consequent_size (numpy.ndarray): Number of features in the consequent.
+        inclusion (numpy.ndarray): Inclusion of the rules, which is not derived from the counts.
+        amplitude (numpy.ndarray): Amplitude of the rules, which is not derived from the counts.
+
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_rules(cls, rules):
+        r"""Collect the counts of a list of :class:`niaarm.rule.Rule` in a single pass."""
+        columns = np.array([
+            (rule.full_count, rule.antecedent_count, rule.consequent_count, rule.num_transactions,
+             len(rule.antecedent), len(rule.consequent))
+            for rule in rules
+        ], dtype=np.int64).reshape(-1, 6).T
+        return cls(*columns, np.array([rule.inclusion for rule in rules], dtype=float),
+                   np.array([rule.amplitude for rule in rules], dtype=float))
+
+    @property
+    def ant_not_con(self):
+        return self.antecedent - self.full
+
+    @property
+    def con_not_ant(self):
+        return self.consequent - self.full
+
+    @property
+    def not_ant_not_con(self):
+        return self.num_transactions - self.antecedent - self.con_not_ant
+
+
+_logs = np.array([-np.inf])
+
+
+def _log(values):
+    r"""Natural logarithm of non-negative integers from a table, equal to :func:`math.log`."""
+    global _logs
+    if np.size(values) and np.max(values) >= len(_logs):
+        _logs = np.array([-np.inf] + [math.log(k) for k in range(1, 2 * int(np.max(values)) + 1)])
+    return _logs[values]
+
+
+def support(table):
+    return table.full / table.num_transactions
+
+
+def rhs_support(table):
+    return table.consequent / table.num_transactions
+
+
+def coverage(table):
+    return table.antecedent / table.num_transactions
+
+
+def confidence(table):
+    return np.where(table.antecedent > 0, table.full / np.maximum(table.antecedent, 1), 0.0)
+
+
+def lift(table):
+    return support(table) / (coverage(table) * rhs_support(table))
+
+
+def conviction(table):
+    return (1 - rhs_support(table)) / (1 - confidence(table) + EPSILON)
+
+
+def interestingness(table):
+    return confidence(table) * (support(table) / rhs_support(table)) * (1 - (support(table) / table.num_transactions))
+
+
+def yulesq(table):
+    ad = table.full * table.not_ant_not_con
+    bc = table.con_not_ant * table.ant_not_con
+    return (ad - bc) / (ad + bc + EPSILON)
+
+
+def netconf(table):
+    cov = coverage(table)
+    return (support(table) - cov * rhs_support(table)) / (cov * (1 - cov + EPSILON))
+
+
+def inclusion(table):
+    return table.inclusion
+
+
+def amplitude(table):
+    return table.amplitude
+
+
+def comprehensibility(table):
+    return _log(1 + table.consequent_size) / _log(1 + table.antecedent_size + table.consequent_size)
+
+
+def zhang(table):
+    support_x = coverage(table)
+    support_y = rhs_support(table)
+    supp = support(table)
+    return (supp - support_x * support_y) / (np.maximum(supp * (1 - support_x), support_x * (support_y - supp)) + EPSILON)
+
+
+def leverage(table):
+    return support(table) - coverage(table) * rhs_support(table)
+
+
+METRICS = {
+    "support": support,
+    "confidence": confidence,
+    "coverage": coverage,
+    "interestingness": interestingness,
+    "comprehensibility": comprehensibility,
+    "amplitude": amplitude,
+    "inclusion": inclusion,
+    "rhs_support": rhs_support,
+    "lift": lift,
+    "conviction": conviction,
+    "yulesq": yulesq,
+    "netconf": netconf,
+    "zhang": zhang,
+    "leverage": leverage,
+}
+
+
+# Metrics with the same value as the property of niaarm.rule.Rule of the same name
+RULE_METRICS = set(METRICS)
+
+
+def register_metric(name, function):
+    r"""Make a metric available to the fitness of :class:`utils.NiaArm.NiaARM` and to :func:`metric_table`.
+
+    Args:
+        name (str): Name of the metric.
+        function (Callable[[Contingency], numpy.ndarray]): Computes the metric of every rule in a
+         :class:`Contingency`, elementwise.
+
+    """
+    METRICS[name] = function
+    # a replaced built-in metric can no longer be read from the rule
+    RULE_METRICS.discard(name)
+
+
+def compute_metrics(table, metrics):
+    r"""Compute metrics from contingency counts.
+
+    Args:
+        table (Contingency): Counts of the rules.
+        metrics (Iterable[str]): Names of registered metrics.
+
+    Returns:
+        dict[str, numpy.ndarray]: Value of every metric for every rule. Undefined values are ``nan`` or ``inf``.
+
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {metric: METRICS[metric](table) for metric in metrics}
+
+
+def rule_metrics(rule, metrics):
+    r"""Compute metrics of a single rule.
+
+    Built-in metrics are read from the properties of the rule, which is much cheaper than building
+    a :class:`Contingency` for one rule. Only registered metrics go through :func:`compute_metrics`.
+
+    Args:
+        rule (Rule): Rule with its counts, e.g. from :meth:`utils.Index.TransactionIndex.rule`.
+        metrics (Sequence[str]): Names of registered metrics.
+
+    Returns:
+        list[float]: Value of every metric.
+
+    """
+    if RULE_METRICS.issuperset(metrics):
+        return [getattr(rule, metric) for metric in metrics]
+    values = compute_metrics(Contingency.from_rules([rule]), metrics)
+    return [values[metric][0] for metric in metrics]
+
+
+def metric_table(rules, metrics):
+    r"""Compute metrics of a list of rules in one pass over the rules.
+
+    Args:
+        rules (RuleList): Mined rules.
+        metrics (Iterable[str]): Names of registered metrics, or ``fitness``.
+
+    Returns:
+        dict[str, numpy.ndarray]: Value of every metric for every rule.
+
+    """
+    metrics = list(metrics)
+    table = compute_metrics(Contingency.from_rules(rules), [metric for metric in metrics if metric != "fitness"])
+    if "fitness" in metrics:
+        table["fitness"] = np.array([rule.fitness for rule in rules], dtype=float)
+    return table
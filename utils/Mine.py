@@ -1,10 +1,9 @@
 from collections import namedtuple
 import time
 import numpy as np
-from niapy.util.factory import get_algorithm
-from niaarm.text import NiaARTM
 
 from utils.NiaArm import NiaARM
+from utils.Memory import MemoryLimit, limit_caches, megabytes
 from niapy.task import OptimizationType, Task
 
 
@@ -29,6 +28,17 @@ def get_rules(
     max_iters=np.inf,
     logging=False,
     grouping=True,
+    approximate=False,
+    epsilon=0.02,
+    delta=0.05,
+    seed=None,
+    encoding="feature",
+    workers=None,
+    use_processes=False,
+    bins=None,
+    binning="frequency",
+    memory_limit=None,
+    monitor=None,
     **kwargs,
 ):
     """Mine association rules on a dataset.
@@ -45,13 +55,43 @@ def get_rules(
          ``max_iters`` must be provided.
         max_iters (Optional[int]): Maximum number of fitness evaluations. Default: ``inf``.
         logging (bool): Enable logging of fitness improvements. Default: ``False``.
+        approximate (bool): Score candidates on a stratified row sample and re-score the archived rules exactly
+         after the run.
+         Default: ``False``.
+        epsilon (float): Tolerated error of the sampled estimates. Default: ``0.02``.
+        delta (float): Probability of exceeding ``epsilon``. Default: ``0.05``.
+        seed (Optional[int]): Seed for drawing the row sample.
+        encoding (str): Problem encoding, ``feature`` or ``group``. Default: ``feature``.
+        workers (Optional[int]): Run the algorithm in asynchronous steady-state mode with this many evaluation
+         workers. Only the algorithms in :mod:`algos` have this mode. Default: ``None``, the regular generational
+         loop.
+        use_processes (bool): Use worker processes instead of threads in steady-state mode. Default: ``False``.
+        bins (Optional[int]): Discretize numeric features into this many bins and snap intervals to them.
+         Default: ``None``.
+        binning (str): ``frequency`` or ``width`` bins. Default: ``frequency``.
+        memory_limit (Optional[float]): Run in memory-bounded mode, keeping the resident set size below this many
+         megabytes. The population is stored as ``float32``, the index caches are sized to the memory left and
+         a ``MemoryError`` is raised if the limit is exceeded anyway. The rule archive is not bounded, a run that
+         archives too many rules stops with that error. ``algorithm`` is restored after the run. Default: ``None``.
+        monitor (Optional[RunMonitor]): Expose the progress of the run through a
+         :class:`utils.Monitor.MetricsServer`. Default: ``None``.
 
     Returns:
         Result: A named tuple containing the list of mined rules and the algorithm's run time in seconds.
 
     """
+    if isinstance(algorithm, str):
+        from niapy.util.factory import get_algorithm
+
+        algorithm = get_algorithm(algorithm, **kwargs)
+    if workers and not hasattr(algorithm, "run_steady_state"):
+        raise ValueError(f"{type(algorithm).__name__} has no steady-state mode, run it without workers")
+
     problem = NiaARM(
-        dataset.dimension, dataset.features, dataset.transactions, grouping_data, metrics, logging, grouping
+        dataset.dimension, dataset.features, dataset.transactions, grouping_data, metrics, logging, grouping,
+        approximate, epsilon, delta, seed, encoding, bins, binning,
+        # a dataset attached from shared memory comes with its columns sorted
+        sorted_columns=getattr(dataset, "sorted_columns", None),
     )
     task = Task(
         problem,
@@ -60,11 +100,34 @@ def get_rules(
         optimization_type=OptimizationType.MAXIMIZATION,
     )
 
-    if isinstance(algorithm, str):
-        algorithm = get_algorithm(algorithm, **kwargs)
+    # the callbacks and dtype set for this run are removed from the caller's algorithm afterwards
+    callbacks = list(algorithm.callbacks.callbacks)
+    # only the algorithms of this repository store their population in a chosen dtype
+    dtype = getattr(algorithm, "dtype", None) if memory_limit else None
+
+    if memory_limit:
+        max_rss = megabytes(memory_limit)
+        limit_caches(problem.indexes(), max_rss)
+        if dtype is not None:
+            algorithm.dtype = np.float32
+        algorithm.callbacks.append(MemoryLimit(problem, max_rss))
+
+    if monitor is not None:
+        monitor.attach(task, problem)
+        algorithm.callbacks.append(monitor)
 
     start_time = time.perf_counter()
-    algorithm.run(task)
+    try:
+        if workers:
+            algorithm.run_steady_state(task, workers, use_processes)
+        else:
+            algorithm.run(task)
+    finally:
+        algorithm.callbacks.callbacks = callbacks
+        if dtype is not None:
+            algorithm.dtype = dtype
+    # the exact scores of an approximate run are part of its run time
+    problem.rescore_rules()
     stop_time = time.perf_counter()
 
     problem.rules.sort()
@@ -109,6 +172,10 @@ def get_text_rules(
         Result: A named tuple containing the list of mined rules and the algorithm's run time in seconds.
 
     """
+    # text mining is rarely used, so its dependencies are only imported here
+    from niaarm.text import NiaARTM
+    from niapy.util.factory import get_algorithm
+
     problem = NiaARTM(
         max_terms,
         corpus.terms(),
@@ -0,0 +1,291 @@
+import math
+import multiprocessing
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from niapy.callbacks import Callback
+
+from utils.Index import CACHES
+from utils.NiaArm import EVALUATION_PHASES
+
+DEFAULT_ADDRESS = ("localhost", 9464)
+
+# Name, type and help of every exported metric
+_METRICS = (
+    ("narm_running", "gauge", "1 while the run is in progress."),
+    ("narm_evaluations_total", "counter", "Fitness evaluations done."),
+    ("narm_evaluations_per_second", "gauge", "Mean evaluation rate since the start of the run."),
+    ("narm_iterations_total", "counter", "Iterations of the algorithm done."),
+    ("narm_archive_rules", "gauge", "Rules in the archive."),
+    ("narm_best_fitness", "gauge", "Best fitness found."),
+    ("narm_cache_hits_total", "counter", "Lookups answered by a cache of the transaction index."),
+    ("narm_cache_misses_total", "counter", "Lookups a cache of the transaction index could not answer."),
+    ("narm_cache_hit_ratio", "gauge", "Share of the lookups of a cache answered by it."),
+    ("narm_phase_seconds_total", "counter", "Seconds spent in a phase of the run or of the evaluations."),
+)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f"{name}=\"{value}\"" for name, value in zip(labels, escaped)) + "}"
+
+
+def _value(value):
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class RunMonitor(Callback):
+    r"""Live counters of one run, attached to the algorithm as a callback.
+
+    The monitor only records the start and end of the phases of :meth:`utils.Algorithm.Algorithm.run`.
+    Everything else is read from the counters the task, the problem and its indexes keep anyway
+    when :meth:`samples` is called, so the evaluation path never waits for a lock or the server. Values
+    read while an evaluation is running can be one evaluation apart. In steady-state mode, the phase
+    times and cache counters of the evaluation workers are added to the problem as their candidates
+    are folded back.
+
+    Args:
+        **labels: Labels of all samples of the run, e.g. ``algorithm`` and ``dataset``.
+
+    Attributes:
+        labels (dict[str, str]): Labels of the run.
+        task (Optional[Task]): Task of the run, set by :meth:`attach`.
+        problem (Optional[NiaARM]): Problem of the run, set by :meth:`attach`.
+
+    """
+
+    def __init__(self, **labels):
+        super().__init__()
+        self.labels = labels
+        self.task = None
+        self.problem = None
+        self.started = None
+        self.initialized = None
+        self.finished = None
+
+    def attach(self, task, problem):
+        r"""Set the task and problem the counters are read from."""
+        self.task = task
+        self.problem = problem
+
+    def before_run(self):
+        self.started = time.perf_counter()
+        self.initialized = None
+        self.finished = None
+
+    def before_iteration(self, population, fitness, best_x, best_fitness, **params):
+        if self.initialized is None:
+            self.initialized = time.perf_counter()
+
+    def after_run(self):
+        self.finished = time.perf_counter()
+
+    def samples(self):
+        r"""Current value of every metric.
+
+        Returns:
+            list[Tuple[str, dict[str, str], float]]: Metric name, labels and value of every sample.
+
+        """
+        if self.task is None or self.started is None:
+            return []
+
+        now = self.finished or time.perf_counter()
+        task = self.task
+        problem = self.problem
+        elapsed = now - self.started
+        init_end = self.initialized or now
+
+        samples = [
+            ("narm_running", {}, 0 if self.finished else 1),
+            ("narm_evaluations_total", {}, task.evals),
+            ("narm_evaluations_per_second", {}, task.evals / elapsed if elapsed > 0 else 0.0),
+            ("narm_iterations_total", {}, task.iters),
+            ("narm_archive_rules", {}, len(problem.rules)),
+            ("narm_best_fitness", {}, task.x_f if math.isfinite(task.x_f) else math.nan),
+        ]
+
+        indexes = problem.indexes()
+        for cache in CACHES:
+            hits = sum(index.hits[cache] for index in indexes)
+            misses = sum(index.misses[cache] for index in indexes)
+            samples.append(("narm_cache_hits_total", {"cache": cache}, hits))
+            samples.append(("narm_cache_misses_total", {"cache": cache}, misses))
+            samples.append(("narm_cache_hit_ratio", {"cache": cache}, hits / (hits + misses) if hits + misses else math.nan))
+
+        samples.append(("narm_phase_seconds_total", {"phase": "init"}, init_end - self.started))
+        samples.append(("narm_phase_seconds_total", {"phase": "iterations"}, now - init_end))
+        for phase in EVALUATION_PHASES:
+            samples.append(("narm_phase_seconds_total", {"phase": phase}, problem.phase_times[phase]))
+
+        return [(name, {**self.labels, **labels}, value) for name, labels, value in samples]
+
+
+class ForwardingMonitor(RunMonitor):
+    r"""Monitor of a run in another process, e.g. a job of a :class:`mining_service.MiningService` worker.
+
+    The samples are put on the queue of a :class:`MetricsServer` after every iteration and at the end
+    of the run, so they are never sent from the evaluation path.
+
+    Args:
+        queue (multiprocessing.Queue): Queue of the server, see :meth:`MetricsServer.queue`.
+        **labels: Labels of the run, a later run with the same labels replaces it.
+
+    """
+
+    def __init__(self, queue, **labels):
+        super().__init__(**labels)
+        self.queue = queue
+
+    def after_iteration(self, population, fitness, best_x, best_fitness, **params):
+        self.queue.put((_key(self.labels), self.samples()))
+
+    def after_run(self):
+        super().after_run()
+        self.queue.put((_key(self.labels), self.samples()))
+
+
+class _Received:
+    # samples of a run in another process, as last sent by its ForwardingMonitor
+
+    def __init__(self, samples):
+        self._samples = samples
+
+    def samples(self):
+        return self._samples
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def render(monitors):
+    r"""Write the samples of runs in the Prometheus text exposition format.
+
+    Args:
+        monitors (Iterable[RunMonitor]): Monitors of the runs.
+
+    Returns:
+        str: The exposition, one ``HELP`` and ``TYPE`` line per metric followed by its samples.
+
+    """
+    by_name = {name: [] for name, _, _ in _METRICS}
+    for monitor in monitors:
+        for name, labels, value in monitor.samples():
+            by_name[name].append(f"{name}{_labels(labels)} {_value(value)}")
+
+    lines = []
+    for name, kind, description in _METRICS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(by_name[name])
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render(list(self.server.registry.values())).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # scrapes are not logged, and unix socket clients have no address
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    r"""Serve the metrics of running jobs over HTTP from a background thread.
+
+    ``GET /metrics`` answers with :func:`render` of the registered monitors. The server thread only
+    reads the monitors' counters, nothing is sent from the evaluation path. The latest run of every
+    label set is kept, so the final values of finished runs stay visible.
+
+    Args:
+        address (Union[Tuple[str, int], str]): Host and port to listen on, or the path of a Unix socket.
+         Default: ``localhost:9464``.
+
+    Attributes:
+        address (Union[Tuple[str, int], str]): Address the server listens on, with the port chosen by the system
+         if ``0`` was given.
+
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server = _UnixHTTPServer(address, _Handler)
+            self.address = address
+        else:
+            self._server = ThreadingHTTPServer(address, _Handler)
+            self.address = self._server.server_address[:2]
+        self._server.registry = {}
+        self._queue = None
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def monitor(self, **labels):
+        r"""Create and register a monitor for a run, to pass as ``monitor`` to :func:`utils.Mine.get_rules`.
+
+        Args:
+            **labels: Labels of the run, a later run with the same labels replaces it.
+
+        Returns:
+            RunMonitor: The registered monitor.
+
+        """
+        monitor = RunMonitor(**labels)
+        # a single assignment, scrapes iterate over a copy of the values
+        self._server.registry[_key(labels)] = monitor
+        return monitor
+
+    def queue(self):
+        r"""Get the queue that :class:`ForwardingMonitor` of runs in other processes send their samples to.
+
+        The queue is created on the first call, with a thread storing the received samples.
+
+        Returns:
+            multiprocessing.Queue: Queue to pass to the other processes, e.g. as an argument of their initializer.
+
+        """
+        if self._queue is None:
+            self._queue = multiprocessing.Queue()
+            threading.Thread(target=self._receive, daemon=True).start()
+        return self._queue
+
+    def _receive(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            key, samples = item
+            self._server.registry[key] = _Received(samples)
+
+    def shutdown(self):
+        if self._queue is not None:
+            self._queue.put(None)
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
@@ -4,8 +4,17 @@ from niaarm.rule_list import RuleList
 from niapy.problems import Problem
 from niapy.util.array import objects_to_array
 
+from utils.Index import CACHES, TransactionIndex
+from utils.Metrics import METRICS, rule_metrics
+
+import copy
+import math
+import time
 import numpy as np
 
+# Parts of an evaluation whose time is accumulated in NiaARM.phase_times
+EVALUATION_PHASES = ("decode", "score", "archive")
+
 class NiaARM(Problem):
     r"""Representation of Association Rule Mining as an optimization problem.
 
@@ -29,31 +38,62 @@ class NiaARM(Problem):
         metrics (Union[Dict[str, float], Sequence[str]]): Metrics to take into account when computing the fitness.
          Metrics can either be passed as a Dict of pairs {'metric_name': <weight of metric>} or
          a sequence of metrics as strings, in which case, the weights of the metrics will be set to 1.
+         Any metric of :data:`utils.Metrics.METRICS` can be used, including ones added with
+         :func:`utils.Metrics.register_metric`.
         logging (bool): Enable logging of fitness improvements. Default: ``False``.
+        approximate (bool): Score candidates on a stratified row sample. The archived rules are re-scored
+         exactly on all transactions by :meth:`rescore_rules` after the run. Default: ``False``.
+        epsilon (float): Tolerated absolute error of the sampled support/confidence estimates. Default: ``0.02``.
+        delta (float): Probability that a sampled estimate exceeds ``epsilon``. Default: ``0.05``.
+        seed (Optional[int]): Seed for drawing the row sample.
+        encoding (str): ``feature`` encodes inclusion and order per feature. ``group`` uses one inclusion gene and
+         one permutation key per group of ``grouping_data``, features outside of any group form their own group.
+         The per-feature genes then only hold the bounds and ``dimension`` is computed from the groups.
+         Default: ``feature``.
+        bins (Optional[int]): Discretize every numeric feature into this many bins and snap decoded intervals
+         to bin edges, see :class:`utils.Index.TransactionIndex`. Default: ``None``, intervals are not snapped.
+        binning (str): ``frequency`` or ``width`` bins. Default: ``frequency``.
+        sorted_columns (Optional[dict[str, Tuple[numpy.ndarray, numpy.ndarray]]]): Precomputed sort orders of the
+         transactions, see :class:`utils.Index.TransactionIndex`. Default: ``None``.
 
     Attributes:
         rules (RuleList): A list of mined association rules.
+        sample (pandas.Dataframe): Transactions used to score candidates, all transactions unless ``approximate``.
+        index (TransactionIndex): Sorted column index of ``sample``.
+        full_index (TransactionIndex): Sorted column index of all transactions.
+        phase_times (dict[str, float]): Seconds spent decoding candidates, scoring rules and checking the archive.
 
     """
 
-    available_metrics = (
-        "support",
-        "confidence",
-        "coverage",
-        "interestingness",
-        "comprehensibility",
-        "amplitude",
-        "inclusion",
-        "rhs_support",
-    )
-
-    def __init__(self, dimension, features, transactions, grouping_data, metrics, logging=False, grouping=True):
+    # metrics registered with utils.Metrics.register_metric
+    available_metrics = METRICS
+
+    def __init__(self, dimension, features, transactions, grouping_data, metrics, logging=False, grouping=True,
+                 approximate=False, epsilon=0.02, delta=0.05, seed=None, encoding="feature",
+                 bins=None, binning="frequency", sorted_columns=None):
         self.features = features
         self.num_features = len(features)
         self.transactions = transactions
         self.grouping_data = grouping_data
         self.grouping = grouping
 
+        if encoding not in ("feature", "group"):
+            raise ValueError(f"Invalid encoding: {encoding}")
+        self.encoding = encoding
+        if encoding == "group":
+            self.groups = self._feature_groups()
+            self.num_groups = len(self.groups)
+            # bound genes of each feature, followed by an inclusion gene and a permutation key per group
+            self.bound_positions = np.cumsum([0] + [1 + int(f.dtype != "cat") for f in features])
+            self.group_offset = int(self.bound_positions[-1])
+            dimension = self.group_offset + 2 * self.num_groups + 1
+        else:
+            # value and threshold gene of each feature, the value gene is the first one of the feature
+            self.value_positions = np.cumsum([0] + [2 + int(f.dtype != "cat") for f in features])[:-1]
+            self.threshold_positions = self.value_positions + 1 + np.array([int(f.dtype != "cat") for f in features],
+                                                                          dtype=int)
+            self._init_group_members()
+
         if not metrics:
             raise ValueError("No metrics provided")
 
@@ -75,74 +115,148 @@ class NiaARM(Problem):
         self.logging = logging
         self.best_fitness = np.NINF
         self.rules = RuleList()
+        self.phase_times = dict.fromkeys(EVALUATION_PHASES, 0.0)
+
+        self.approximate = approximate
+        self.sample = transactions
+        if approximate:
+            sample_size = hoeffding_sample_size(epsilon, delta)
+            if sample_size < len(transactions):
+                rows = stratified_sample(len(transactions), sample_size, np.random.default_rng(seed))
+                self.sample = transactions.iloc[rows].reset_index(drop=True)
+            else:
+                self.approximate = False
+
+        self.bins = bins
+        self.full_index = TransactionIndex(transactions, features, bins, binning, sorted_columns=sorted_columns)
+        self.index = TransactionIndex(self.sample, features) if self.approximate else self.full_index
+
         super().__init__(dimension, 0.0, 1.0)
 
     def adapt_vector(self, vector, missing_features):
-        permutation = vector[-self.num_features :]
-        permutation = sorted(range(self.num_features), key=lambda k: permutation[k])
+        if missing_features:
+            # every missing feature is added on its own, so the order of the features does not matter
+            missing_features = set(missing_features)
+            missing = [i for i, feature in enumerate(self.features) if feature.name in missing_features]
+            vector[self.value_positions[missing]] = vector[self.threshold_positions[missing]]
 
-        for i in permutation:
-            feature = self.features[i]
+        return vector
 
-            # set current position in the vector
-            vector_position = self.feature_position(i)
+    def permutation(self, vector):
+        r"""Order of the features encoded by the last ``num_features`` genes of a vector.
 
-            # get a threshold for each feature
-            threshold_position = vector_position + 1 + int(feature.dtype != "cat")
+        A stable argsort of the permutation keys, so equal keys keep the order of their features as
+        with ``sorted(range(num_features), key=...)``.
 
-            if missing_features and feature.name in missing_features:
-                vector[vector_position] = vector[threshold_position]
+        Args:
+            vector (numpy.ndarray): A solution vector, or a population matrix to order every row at once.
 
-        return vector
+        Returns:
+            numpy.ndarray: Feature indices in decoding order, one row per solution for a matrix.
 
-    def build_rule(self, vector):
-        rule = []
+        """
+        return np.argsort(vector[..., -self.num_features :], axis=-1, kind="stable")
 
-        permutation = vector[-self.num_features :]
-        permutation = sorted(range(self.num_features), key=lambda k: permutation[k])
+    def build_rule(self, vector, permutation=None):
+        return list(self.decode(vector, permutation))
 
-        for i in permutation:
-            feature = self.features[i]
+    def decode(self, vector, permutation=None):
+        r"""Decode the features of a solution vector one at a time, in the order of its permutation.
 
-            # set current position in the vector
-            vector_position = self.feature_position(i)
+        Genes are read from ``vector`` as they are needed, so a population stored as ``float32`` is never
+        copied to a wider type.
 
-            # get a threshold for each feature
-            threshold_position = vector_position + 1 + int(feature.dtype != "cat")
+        Args:
+            vector (numpy.ndarray): Solution vector without the cut point.
+            permutation (Optional[numpy.ndarray]): Order of the features, see :meth:`permutation`. Computed if
+             not given.
 
-            # changed from > to >=
-            if vector[vector_position] >= vector[threshold_position]:
-                if feature.dtype != "cat":
-                    border1 = (
-                        vector[vector_position] * (feature.max_val - feature.min_val)
-                        + feature.min_val
-                    )
-                    vector_position = vector_position + 1
-                    border2 = (
-                        vector[vector_position] * (feature.max_val - feature.min_val)
-                        + feature.min_val
-                    )
-                    if border1 > border2:
-                        border1, border2 = border2, border1
-                    if feature.dtype == "int":
-                        border1 = round(border1)
-                        border2 = round(border2)
+        Yields:
+            Optional[Feature]: The decoded feature, or ``None`` if it is not selected.
 
-                    rule.append(Feature(feature.name, feature.dtype, border1, border2))
-                else:
-                    categories = feature.categories
-                    selected = round(vector[vector_position] * (len(categories) - 1))
-                    rule.append(
-                        Feature(
-                            feature.name,
-                            feature.dtype,
-                            categories=[categories[selected]],
-                        )
-                    )
+        """
+        if permutation is None:
+            permutation = self.permutation(vector)
+
+        # changed from > to >=
+        selected = vector[self.value_positions] >= vector[self.threshold_positions]
+
+        for i in permutation:
+            if selected[i]:
+                yield self._decode_feature(self.features[i], vector, self.value_positions[i])
             else:
-                rule.append(None)
+                yield None
+
+    @staticmethod
+    def _decode_feature(feature, vector, vector_position):
+        r"""Map the genes of a selected feature, starting at ``vector_position``, to its interval or category."""
+        if feature.dtype != "cat":
+            border1 = (
+                vector[vector_position] * (feature.max_val - feature.min_val)
+                + feature.min_val
+            )
+            border2 = (
+                vector[vector_position + 1] * (feature.max_val - feature.min_val)
+                + feature.min_val
+            )
+            if border1 > border2:
+                border1, border2 = border2, border1
+            if feature.dtype == "int":
+                border1 = round(border1)
+                border2 = round(border2)
+
+            return Feature(feature.name, feature.dtype, border1, border2)
+        else:
+            categories = feature.categories
+            selected = round(vector[vector_position] * (len(categories) - 1))
+            return Feature(
+                feature.name,
+                feature.dtype,
+                categories=[categories[selected]],
+            )
+
+    def _feature_groups(self):
+        r"""Indices of the features of each group, features outside of any group form their own group."""
+        index = {feature.name: i for i, feature in enumerate(self.features)}
+        assigned = set()
+        groups = []
+        for group in self.grouping_data:
+            members = [index[name] for name in group.keys() if name in index and index[name] not in assigned]
+            if members:
+                assigned.update(members)
+                groups.append(members)
+        groups.extend([i] for i in range(self.num_features) if i not in assigned)
+        return groups
+
+    def build_group_rule(self, sol):
+        r"""Decode a vector of the ``group`` encoding.
+
+        Groups whose inclusion gene is at least 0.5 are selected, ordered by their permutation keys and
+        split by the cut point, so all features of a group end up on the same side of the rule.
+
+        Args:
+            sol (numpy.ndarray): Solution vector, including the cut point.
+
+        Returns:
+            Tuple[list[Feature], list[Feature]]: Antecedent and consequent of the rule.
+
+        """
+        inclusion = sol[self.group_offset : self.group_offset + 2 * self.num_groups : 2]
+        keys = sol[self.group_offset + 1 : self.group_offset + 2 * self.num_groups : 2]
+        order = np.argsort(keys, kind="stable")
 
-        return rule
+        cut = _cut_point(sol[self.dimension - 1], self.num_groups) if self.num_groups > 2 else 1
+
+        antecedent = []
+        consequent = []
+        for rank, g in enumerate(order):
+            if inclusion[g] < 0.5:
+                continue
+            side = antecedent if rank < cut else consequent
+            for i in self.groups[g]:
+                side.append(self._decode_feature(self.features[i], sol, self.bound_positions[i]))
+
+        return antecedent, consequent
 
     def threshold_move(self, current_feature):
         return 1 + int(self.features[current_feature].dtype != "cat")
@@ -155,29 +269,37 @@ class NiaARM(Problem):
 
     def _evaluate(self, sol):
         r"""Evaluate association rule."""
-        cut_value = sol[self.dimension - 1]  # get cut point value
-        solution = sol[:-1]  # remove cut point
-
-        cut = _cut_point(cut_value, self.num_features)
-
-        rule = self.build_rule(solution)
+        start = time.perf_counter()
+        if self.encoding == "group":
+            antecedent, consequent = self.build_group_rule(sol)
+        else:
+            cut_value = sol[self.dimension - 1]  # get cut point value
+            solution = sol[:-1]  # remove cut point
 
-        # get antecedent and consequent of rule
-        antecedent = rule[:cut]
-        consequent = rule[cut:]
+            cut = _cut_point(cut_value, self.num_features)
 
-        antecedent = [attribute for attribute in antecedent if attribute]
-        consequent = [attribute for attribute in consequent if attribute]
+            # split the decoded features into antecedent and consequent as they are decoded
+            antecedent = []
+            consequent = []
+            for rank, attribute in enumerate(self.decode(solution)):
+                if attribute:
+                    (antecedent if rank < cut else consequent).append(attribute)
+        self.phase_times["decode"] += time.perf_counter() - start
 
         # check if the rule is feasible
         if antecedent and consequent:
-            rule = Rule(antecedent, consequent, transactions=self.transactions)
-            metrics = [getattr(rule, metric) for metric in self.metrics]
-            fitness = np.dot(self.weights, metrics) / self.sum_weights
-            rule.fitness = fitness
+            if self.bins:
+                antecedent = [self.full_index.snap(feature) for feature in antecedent]
+                consequent = [self.full_index.snap(feature) for feature in consequent]
+
+            rule, metrics, fitness = self._score(antecedent, consequent, self.index)
 
-            if rule.support > 0.0 and rule.confidence > 0.0 and rule not in self.rules:
-                # save feasible rule
+            start = time.perf_counter()
+            new = rule.support > 0.0 and rule.confidence > 0.0 and rule not in self.rules
+            self.phase_times["archive"] += time.perf_counter() - start
+
+            if new:
+                # save feasible rule, with sampled metrics until rescore_rules if approximate
                 self.rules.append(rule)
 
                 if self.logging and fitness > self.best_fitness:
@@ -195,6 +317,91 @@ class NiaARM(Problem):
         else:
             return -1.0
 
+    def _score(self, antecedent, consequent, index):
+        r"""Build a rule on the indexed transactions and compute its weighted fitness.
+
+        Returns:
+            Tuple[Rule, list[float], float]: The rule, its metric values and its fitness.
+
+        """
+        start = time.perf_counter()
+        rule = index.rule(antecedent, consequent)
+        metrics = rule_metrics(rule, self.metrics)
+        fitness = np.dot(self.weights, metrics) / self.sum_weights
+        rule.fitness = fitness
+        self.phase_times["score"] += time.perf_counter() - start
+        return rule, metrics, fitness
+
+    def worker_copy(self):
+        r"""Copy of the problem for a concurrent evaluation worker of :meth:`utils.Algorithm.Algorithm.run_steady_state`.
+
+        The copy has an empty rule archive, phase times and indexes with caches of their own, see
+        :meth:`utils.Index.TransactionIndex.worker_copy`.
+        """
+        problem = copy.copy(self)
+        problem.rules = RuleList()
+        problem.phase_times = dict.fromkeys(EVALUATION_PHASES, 0.0)
+        problem.full_index = self.full_index.worker_copy()
+        problem.index = problem.full_index if self.index is self.full_index else self.index.worker_copy()
+        return problem
+
+    def indexes(self):
+        r"""Transaction indexes of the problem, ``full_index`` first and ``index`` if it is a sample index."""
+        return [self.full_index] if self.index is self.full_index else [self.full_index, self.index]
+
+    def take_counters(self):
+        r"""Get the phase times and cache counters accumulated since the last call and reset them.
+
+        Evaluation workers send them back with every candidate, see :meth:`add_counters`.
+
+        Returns:
+            Tuple[dict[str, float], list[Tuple[dict[str, int], dict[str, int]]]]: Phase times, and cache hits
+            and misses of every index of :meth:`indexes`.
+
+        """
+        counters = self.phase_times, [(index.hits, index.misses) for index in self.indexes()]
+        self.phase_times = dict.fromkeys(EVALUATION_PHASES, 0.0)
+        for index in self.indexes():
+            index.hits = dict.fromkeys(CACHES, 0)
+            index.misses = dict.fromkeys(CACHES, 0)
+        return counters
+
+    def add_counters(self, counters):
+        r"""Add counters of a worker copy, taken by :meth:`take_counters`, to those of this problem."""
+        phase_times, index_counters = counters
+        for phase, seconds in phase_times.items():
+            self.phase_times[phase] += seconds
+        for index, (hits, misses) in zip(self.indexes(), index_counters):
+            for cache in CACHES:
+                index.hits[cache] += hits[cache]
+                index.misses[cache] += misses[cache]
+
+    def rescore_rules(self):
+        r"""Score the archived rules exactly on all transactions, after an ``approximate`` run.
+
+        Candidates are only scored on the row sample during the run, so an evaluation costs the same
+        for any number of transactions. Every archived rule is then scored once on all transactions,
+        and rules that hold no transaction there are dropped. The number of exact scores is the
+        archive size, a fifth to a half of the evaluations for explorative algorithms such as BA and a
+        few percent for converging ones such as DE.
+
+        Note: Does nothing unless the candidates were scored on a sample.
+        """
+        if not self.approximate:
+            return
+
+        rules = RuleList()
+        for sampled in self.rules:
+            rule, _, _ = self._score(sampled.antecedent, sampled.consequent, self.full_index)
+            if rule.support > 0.0 and rule.confidence > 0.0:
+                rules.append(rule)
+        self.rules = rules
+
+    def clear_caches(self):
+        r"""Drop the caches of the transaction indexes, see :meth:`utils.Index.TransactionIndex.clear_caches`."""
+        for index in self.indexes():
+            index.clear_caches()
+
     def initial_population_grouping(self, population):
         r"""Generate initial population with grouping.
 
@@ -206,16 +413,23 @@ class NiaARM(Problem):
             numpy.ndarray: Initial population.
 
         """
+        if self.encoding == "group":
+            # groups are selected as a whole, there is nothing to repair
+            return population
+
         less_random_pop = []
         grouping_data = self.grouping_data
 
-        for individual in population:
-            rule = self.build_rule(individual)
-            rule_features = []
+        # the orders of all individuals in one batched argsort
+        permutations = self.permutation(np.array([individual.x for individual in population]))
+
+        for individual, permutation in zip(population, permutations):
+            rule = self.build_rule(individual, permutation)
+            rule_features = set()
 
             for feature in rule:
                 if isinstance(feature, Feature):
-                    rule_features.append(str(feature.name))
+                    rule_features.add(str(feature.name))
 
             missing_features = []
 
@@ -243,50 +457,97 @@ class NiaARM(Problem):
 
         return result
 
-    def initial_population_grouping_np(self, population):
+    def _init_group_members(self):
+        r"""Flatten the groups into member feature indices and group start offsets for :meth:`repair_grouping`."""
+        index = {feature.name: i for i, feature in enumerate(self.features)}
+        members = []
+        offsets = []
+        sizes = []
+        for group in self.grouping_data:
+            group_members = [index[name] for name in group.keys() if name in index]
+            # a single present feature can never be split from its group
+            if len(group_members) > 1:
+                offsets.append(len(members))
+                sizes.append(len(group_members))
+                members.extend(group_members)
+        self.group_members = np.array(members, dtype=int)
+        self.group_starts = np.array(offsets, dtype=int)
+        self.group_sizes = np.array(sizes, dtype=int)
+        self.member_group = np.repeat(np.arange(len(sizes)), sizes)
+
+    def repair_grouping(self, population):
+        r"""Make every group that is partially selected fully selected, in place.
+
+        A feature is selected when its value gene is at least its threshold gene, a missing
+        member is added by copying its threshold gene to its value gene, as in :meth:`adapt_vector`.
+        The repair is a few vectorized passes over the population, so it can be applied to every
+        new candidate or population during a run.
+
+        Args:
+            population (numpy.ndarray): A single solution vector or a population matrix.
+
+        Returns:
+            numpy.ndarray: The repaired solution(s).
+
+        """
+        if self.encoding == "group" or len(self.group_members) == 0:
+            return population
+
+        pop = population if population.ndim == 2 else population[np.newaxis, :]
+        member_values = pop[:, self.value_positions[self.group_members]]
+        member_thresholds = pop[:, self.threshold_positions[self.group_members]]
+        selected = member_values >= member_thresholds
+
+        counts = np.add.reduceat(selected, self.group_starts, axis=1, dtype=int)
+        partial = (counts > 0) & (counts < self.group_sizes)
+
+        rows, cols = np.nonzero(partial[:, self.member_group] & ~selected)
+        if len(rows):
+            features = self.group_members[cols]
+            pop[rows, self.value_positions[features]] = pop[rows, self.threshold_positions[features]]
+
+        return population
+
+    def initial_population_grouping_np(self, population, copy=True):
         r"""Generate initial population with grouping.
 
         Args:
             grouping_data (list): The grouping_data.
             population (int): Population size.
+            copy (bool): Repair a copy of the population, otherwise it is repaired in place
+             and keeps its floating point dtype. Default: ``True``.
 
         Returns:
             numpy.ndarray: Initial population.
 
         """
-        less_random_pop = []
-        grouping_data = self.grouping_data
+        if self.encoding == "group":
+            # groups are selected as a whole, there is nothing to repair
+            return population
 
-        for individual in population:
-            rule = self.build_rule(individual)
-            rule_features = []
+        if copy or population.dtype.kind != "f":
+            population = np.array(population, dtype=float)
+        return self.repair_grouping(population)
 
-            for feature in rule:
-                if isinstance(feature, Feature):
-                    rule_features.append(str(feature.name))
 
-            missing_features = []
+def hoeffding_sample_size(epsilon, delta):
+    r"""Number of rows needed to estimate a proportion within ``epsilon`` with probability ``1 - delta``.
 
-            new_individual = individual.copy()
-            for group in grouping_data:
-                group_features = list(group.keys())
-
-                if all(feature in rule_features for feature in group_features):
-                    continue
-                else:
-                    for feature in group_features:
-                        if feature in rule_features:
-                            missing_features.extend([feature for feature in group_features if feature not in rule_features])
+    Note: Uses the Hoeffding bound :math:`n = \lceil \ln(2 / \delta) / (2 \epsilon^2) \rceil`, which holds
+    for support directly and for confidence on rules whose coverage is not vanishingly small.
+    """
+    return math.ceil(math.log(2 / delta) / (2 * epsilon ** 2))
 
-            if missing_features:
-                new_individual = self.adapt_vector(new_individual, missing_features)
-                less_random_pop.append(new_individual)
-            else:
-                less_random_pop.append(new_individual)
 
-        result = less_random_pop
+def stratified_sample(num_rows, sample_size, rng):
+    r"""Draw one row from each of ``sample_size`` equally sized, contiguous strata.
 
-        return result
+    Note: Rows of the sensor datasets are ordered in time, so every period of the
+    history is represented in the sample.
+    """
+    edges = np.linspace(0, num_rows, sample_size + 1)
+    rows = np.floor(edges[:-1] + rng.random(sample_size) * np.diff(edges)).astype(np.int64)
+    return np.minimum(rows, num_rows - 1)
 
 
 def _cut_point(sol, num_attr):
@@ -0,0 +1,152 @@
+from collections import namedtuple
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from niaarm.feature import Feature
+
+
+class Pruning(namedtuple("Pruning", ("constants", "duplicates", "groups", "num_columns", "ranges"))):
+    """Columns removed by :func:`prune_columns` as a ``namedtuple``.
+
+    Attributes:
+        constants (dict[str, Optional[Feature]]): Constant columns and the single value they hold,
+         ``None`` for columns holding only missing values.
+        duplicates (dict[str, str]): Duplicated columns and the identical column that was kept.
+        groups (list[dict]): The grouping data before pruning.
+        num_columns (int): Number of columns before pruning.
+        ranges (dict[str, Tuple[float, float]]): Minimum and maximum of every numerical column before pruning.
+
+    """
+
+    __slots__ = ()
+
+
+def _constant_feature(name, column):
+    if column.isna().all():
+        # a missing value is not held by any rule, so the column is not reattached
+        return None
+    value = column.iloc[0]
+    if is_numeric_dtype(column):
+        return Feature(name, "float" if column.dtype.kind == "f" else "int", value, value)
+    return Feature(name, "cat", categories=[value])
+
+
+def prune_columns(transactions, group_info):
+    r"""Remove constant and exactly duplicated columns from the search space.
+
+    Columns are compared by a hash of their values, candidates with equal hashes are
+    checked for exact equality before one of them is dropped. The first column of a set
+    of duplicates, in column order, is kept.
+
+    Args:
+        transactions (pandas.DataFrame): The dataset's transactions.
+        group_info (list[dict]): The grouping data.
+
+    Returns:
+        Tuple[pandas.DataFrame, list[dict], Pruning]:
+            1. Transactions without the pruned columns.
+            2. Grouping data without the pruned columns, groups left empty are removed.
+            3. The pruned columns.
+
+    """
+    constants = {}
+    duplicates = {}
+    kept_by_hash = {}
+
+    for name in transactions.columns:
+        column = transactions[name]
+        if column.nunique(dropna=False) <= 1:
+            constants[name] = _constant_feature(name, column)
+            continue
+
+        key = (str(column.dtype), pd.util.hash_pandas_object(column, index=False).sum())
+        for kept in kept_by_hash.setdefault(key, []):
+            if column.equals(transactions[kept]):
+                duplicates[name] = kept
+                break
+        else:
+            kept_by_hash[key].append(name)
+
+    pruned = set(constants) | set(duplicates)
+    pruned_transactions = transactions.loc[:, [name for name in transactions.columns if name not in pruned]]
+
+    pruned_groups = []
+    for group in group_info:
+        pruned_group = {name: kind for name, kind in group.items() if name not in pruned}
+        if pruned_group:
+            pruned_groups.append(pruned_group)
+
+    # as niaarm.rule.Rule computes the amplitude, with constant columns having the range of a single value
+    minimums = transactions.min(numeric_only=True)
+    maximums = transactions.max(numeric_only=True)
+    ranges = {name: (minimums[name], maximums[name]) for name in minimums.index}
+
+    pruning = Pruning(constants, duplicates, list(group_info), len(transactions.columns), ranges)
+    return pruned_transactions, pruned_groups, pruning
+
+
+def _amplitude(features, ranges):
+    acc = 0
+    for feature in features:
+        if feature.dtype != "cat":
+            feature_min, feature_max = ranges[feature.name]
+            acc += 1 if feature_max == feature_min \
+                else (feature.max_val - feature.min_val) / (feature_max - feature_min)
+    return 1 - (1 / len(features)) * acc
+
+
+def reattach_features(rules, pruning):
+    r"""Add pruned features back to mined rules.
+
+    A duplicated column is added next to every occurrence of the column it duplicates.
+    A constant column is added to the side of the rule that contains another feature
+    of its group, including a reattached duplicate, so group members still appear
+    together. Constant columns holding only missing values are not added.
+
+    Neither changes which transactions a rule covers, so the counts and the metrics
+    derived from them stay valid. Inclusion and amplitude are recomputed on the full
+    set of columns. Comprehensibility and the number of features follow the rule as
+    reattached. The fitness is kept as mined.
+
+    Args:
+        rules (RuleList): Rules mined on the pruned transactions.
+        pruning (Pruning): The columns removed by :func:`prune_columns`.
+
+    Returns:
+        RuleList: The same rules, with the pruned features added in place.
+
+    """
+    twins = {}
+    for name, kept in pruning.duplicates.items():
+        twins.setdefault(kept, []).append(name)
+
+    group_constants = {}
+    for group in pruning.groups:
+        constants = [name for name in group if name in pruning.constants]
+        for name in group:
+            if name not in pruning.constants:
+                group_constants.setdefault(name, []).extend(constants)
+
+    for rule in rules:
+        for side in (rule.antecedent, rule.consequent):
+            twin_features = [
+                Feature(name, feature.dtype, feature.min_val, feature.max_val, feature.categories)
+                for feature in side for name in twins.get(feature.name, [])
+            ]
+            side.extend(twin_features)
+
+            present = {feature.name for feature in side}
+            additions = []
+            for feature in side:
+                for name in group_constants.get(feature.name, []):
+                    if name not in present and pruning.constants[name] is not None:
+                        present.add(name)
+                        additions.append(pruning.constants[name])
+            side.extend(additions)
+
+        features = rule.antecedent + rule.consequent
+        rule._Rule__inclusion = len(features) / pruning.num_columns
+        rule._Rule__amplitude = _amplitude(features, pruning.ranges)
+
+    return rules
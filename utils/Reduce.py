@@ -0,0 +1,182 @@
+import hashlib
+
+import numpy as np
+
+from niaarm.rule_list import RuleList
+
+from utils.Index import TransactionIndex
+from utils.Metrics import metric_table
+
+# Mersenne prime of the MinHash functions, larger than any row number
+_PRIME = (1 << 31) - 1
+
+# Rows hashed at once while computing a signature
+_SIGNATURE_CHUNK = 1 << 16
+
+
+def _digest(rows):
+    return hashlib.blake2b(np.sort(rows).astype(np.int64).tobytes(), digest_size=16).digest()
+
+
+def _coverage(index, rule):
+    # rows of the antecedent, the consequent and the whole rule
+    antecedent = index.itemset_rows(rule.antecedent)
+    consequent = index.itemset_rows(rule.consequent)
+    full = index.filter_rows(antecedent, index.by_selectivity(rule.consequent))
+    return antecedent, consequent, full
+
+
+def _signature(rows, a, b):
+    # MinHash signature of a set of rows, with h(r) = (a * r + b) mod p as the permutations of the rows
+    signature = np.full(len(a), _PRIME, dtype=np.int64)
+    for start in range(0, len(rows), _SIGNATURE_CHUNK):
+        chunk = rows[start:start + _SIGNATURE_CHUNK].astype(np.int64)
+        np.minimum(signature, ((np.outer(chunk, a) + b) % _PRIME).min(axis=0), out=signature)
+    return signature
+
+
+def _pareto_front(values):
+    r"""Indices of the rows of ``values`` not dominated by another row, larger being better."""
+    order = np.lexsort(values.T[::-1])[::-1]
+    if values.shape[1] == 2 and np.isfinite(values).all():
+        # one sweep by descending first metric: a row is dominated by a row with a larger first metric and
+        # at least its second, or by a row with the same first metric and a larger second
+        front = []
+        best_before = -np.inf
+        start = 0
+        while start < len(order):
+            end = start
+            while end < len(order) and values[order[end], 0] == values[order[start], 0]:
+                end += 1
+            second = values[order[start:end], 1]
+            front.extend(k for k, y in zip(order[start:end], second) if y > best_before and y == second[0])
+            best_before = max(best_before, second[0])
+            start = end
+        return front
+
+    front = []
+    for k in order:
+        if front:
+            others = values[front]
+            if np.any(np.all(others >= values[k], axis=1) & np.any(others > values[k], axis=1)):
+                continue
+        front.append(k)
+    return front
+
+
+def _find(parent, k):
+    while parent[k] != k:
+        parent[k] = parent[parent[k]]
+        k = parent[k]
+    return k
+
+
+def reduce_rules(rules, dataset, metrics=("support", "confidence"), similarity=0.9, num_hashes=32, bands=8,
+                 seed=0):
+    r"""Remove redundant, dominated and near-duplicate rules from an archive.
+
+    The rules are streamed once, and every rule is reduced to hashes of the rows of its antecedent,
+    consequent and the whole rule, so memory grows with the number of rules but not with their rows.
+    Rules are compared through those hashes instead of pairwise:
+
+    1. Rules selecting the same rows in antecedent and consequent, like rules whose borders differ
+       by shifts between two values of the data, have the same counts and metrics. Only the fittest is kept.
+    2. Among rules with the same consequent rows, rules dominated by another rule, one at least as good
+       in every metric of ``metrics`` and better in one, are removed. This is not a full subsumption
+       check: rules whose antecedent or consequent rows only contain those of another rule are not compared,
+       as that would compare rules pairwise.
+    3. The remaining rules are clustered by the Jaccard similarity of the rows they cover, found with
+       MinHash signatures split into ``bands`` buckets. Only pairs sharing a bucket are verified, on
+       their rows computed again. The fittest rule of every cluster is kept. Rules covering no row have
+       no signature and are kept as they are.
+
+    Args:
+        rules (RuleList): Mined rules.
+        dataset (Dataset): Dataset the rules were mined on.
+        metrics (Sequence[str]): Metrics compared by dominance, larger being better.
+        similarity (float): Minimum Jaccard similarity of the covered rows of rules in a cluster. ``1`` disables
+         clustering. Default: ``0.9``.
+        num_hashes (int): Length of the MinHash signatures. Default: ``32``.
+        bands (int): Number of LSH bands, must divide ``num_hashes``. Default: ``8``.
+        seed (Optional[int]): Seed of the MinHash permutations.
+
+    Returns:
+        RuleList: The kept rules, in their original order.
+
+    """
+    if num_hashes % bands:
+        raise ValueError("bands must divide num_hashes")
+    if not len(rules):
+        return RuleList()
+
+    index = TransactionIndex(dataset.transactions, dataset.features)
+    fitness = np.array([rule.fitness for rule in rules], dtype=float)
+    table = metric_table(rules, metrics)
+    values = np.stack([table[metric] for metric in metrics], axis=1)
+
+    # the hash functions of the signatures, drawn as the row permutations of MinHash
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, num_hashes, dtype=np.int64)
+    b = rng.integers(0, _PRIME, num_hashes, dtype=np.int64)
+    clustered = similarity < 1
+
+    # 1. identical coverage, with the signature of the best rule of every coverage
+    best = {}
+    consequents = {}
+    signatures = {}
+    sizes = {}
+    for k, rule in enumerate(rules):
+        antecedent, consequent, full = _coverage(index, rule)
+        key = (_digest(antecedent), _digest(consequent))
+        if key not in best or fitness[k] > fitness[best[key]]:
+            if key in best:
+                for state in (consequents, signatures, sizes):
+                    state.pop(best[key], None)
+            best[key] = k
+            consequents[k] = key[1]
+            sizes[k] = len(full)
+            if clustered and len(full):
+                signatures[k] = _signature(full, a, b)
+
+    # 2. dominance among rules with the same consequent rows
+    groups = {}
+    for k in best.values():
+        groups.setdefault(consequents[k], []).append(k)
+    kept = []
+    for group in groups.values():
+        group = np.array(group)
+        kept.extend(group[_pareto_front(values[group])])
+    kept = np.sort(kept)
+
+    if not clustered or len(kept) < 2:
+        return RuleList(rules[k] for k in kept)
+
+    # 3. clusters of near-identical coverage
+    # a rule covering no row has no minimum, and its similarity to other rules is undefined
+    covering = [i for i, k in enumerate(kept) if k in signatures]
+    parent = list(range(len(kept)))
+    rows_per_band = num_hashes // bands
+    for band in range(bands):
+        buckets = {}
+        for i in covering:
+            signature = signatures[kept[i]][band * rows_per_band:(band + 1) * rows_per_band]
+            buckets.setdefault(signature.tobytes(), []).append(i)
+        for bucket in buckets.values():
+            first = bucket[0]
+            first_rows = None
+            for i in bucket[1:]:
+                if _find(parent, i) == _find(parent, first):
+                    continue
+                if first_rows is None:
+                    first_rows = _coverage(index, rules[kept[first]])[2]
+                rows = _coverage(index, rules[kept[i]])[2]
+                intersection = len(np.intersect1d(first_rows, rows, assume_unique=True))
+                if intersection >= similarity * (sizes[kept[first]] + sizes[kept[i]] - intersection):
+                    parent[_find(parent, i)] = _find(parent, first)
+
+    representatives = {}
+    for k in range(len(kept)):
+        root = _find(parent, k)
+        if root not in representatives or fitness[kept[k]] > fitness[kept[representatives[root]]]:
+            representatives[root] = k
+    return RuleList(rules[kept[k]] for k in sorted(representatives.values()))
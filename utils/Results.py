@@ -0,0 +1,155 @@
+import os
+import re
+import glob
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.Metrics import metric_table
+
+RESULTS_DIR = "results"
+# Directories of parquet part files, one per configuration
+RESULTS_STORE = os.path.join(RESULTS_DIR, "runs")
+SWEEP_STORE = os.path.join(RESULTS_DIR, "sweep")
+
+# Metric means stored for every run
+SUMMARY_METRICS = ("confidence", "support", "fitness", "lift", "zhang", "yulesq", "coverage")
+
+# Columns identifying the configuration of a run
+CONFIG_COLUMNS = ("algorithm", "dataset", "evaluations", "grouped", "subsampling_factor")
+
+# Per run lists of the legacy results json files and the columns they are stored in
+_JSON_COLUMNS = {
+    "runtimes": "runtime",
+    "n_rules_learned": "n_rules",
+    "confidences": "confidence",
+    "supports": "support",
+    "fitnesses": "fitness",
+    "lifts": "lift",
+    "zhangs": "zhang",
+    "yulesqs": "yulesq",
+    "coverages": "coverage",
+}
+
+
+def run_summary(rules, runtime):
+    r"""Summarize one run in a single pass over its rules.
+
+    Args:
+        rules (RuleList): Mined rules.
+        runtime (float): Run time of the algorithm in seconds.
+
+    Returns:
+        dict[str, float]: Run time, number of rules and the mean of every metric of ``SUMMARY_METRICS``,
+        which is 0 if no rule was mined.
+
+    """
+    summary = {"runtime": runtime, "n_rules": len(rules)}
+    table = metric_table(rules, SUMMARY_METRICS) if len(rules) else {}
+    for metric in SUMMARY_METRICS:
+        summary[metric] = np.mean(table[metric]) if len(rules) else 0.0
+    return summary
+
+
+def _part_file(path, config):
+    # the same configuration always maps to the same part file
+    values = {name: value.item() if isinstance(value, np.generic) else value for name, value in config.items()}
+    key = json.dumps(values, sort_keys=True, default=str)
+    return os.path.join(path, f"part-{hashlib.sha1(key.encode()).hexdigest()[:16]}.parquet")
+
+
+def append_runs(runs, path=RESULTS_STORE, **config):
+    r"""Add run summaries of one configuration to the results store.
+
+    Every configuration is stored in a part file of its own, so adding runs only reads and writes the
+    runs of that configuration. Runs are keyed by the configuration and their ``run`` number, a run
+    stored again replaces the earlier one.
+
+    Args:
+        runs (list[dict]): Summaries from :func:`run_summary`, in run order.
+        path (str): Directory of the store, created if missing.
+        **config: Values identifying the configuration of the runs, e.g. of ``CONFIG_COLUMNS``.
+
+    Returns:
+        pandas.DataFrame: The stored runs of the configuration.
+
+    """
+    frame = pd.DataFrame([{**config, "run": i, **run} for i, run in enumerate(runs)])
+    part = _part_file(path, config)
+    if os.path.exists(part):
+        frame = pd.concat([pd.read_parquet(part), frame], ignore_index=True)
+        frame = frame.drop_duplicates("run", keep="last").sort_values("run", ignore_index=True)
+    os.makedirs(path, exist_ok=True)
+    # written next to the part and renamed, so an interrupted write never loses the stored runs
+    frame.to_parquet(part + ".tmp", index=False)
+    os.replace(part + ".tmp", part)
+    return frame
+
+
+def load_runs(path=RESULTS_STORE):
+    r"""Load the results store, one row per run.
+
+    Args:
+        path (str): Directory of the store, or a single parquet file.
+
+    Returns:
+        pandas.DataFrame: Runs of all configurations.
+
+    """
+    if os.path.isfile(path):
+        return pd.read_parquet(path)
+    parts = sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+    if not parts:
+        raise FileNotFoundError(f"No runs stored in {path}")
+    return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+
+def summarize(runs, by=CONFIG_COLUMNS):
+    r"""Mean of every numeric run column per configuration.
+
+    Args:
+        runs (pandas.DataFrame): Rows of the results store.
+        by (Sequence[str]): Columns to group by.
+
+    Returns:
+        pandas.DataFrame: One row per configuration, indexed by ``by``.
+
+    """
+    by = [column for column in by if column in runs.columns]
+    values = [column for column in runs.columns if column not in by and column != "run"]
+    return runs.groupby(by, dropna=False)[values].mean(numeric_only=True)
+
+
+def runs_from_json(result):
+    r"""Run summaries of one configuration of a results json written by ``evaluate.py``."""
+    columns = {column: result[key] for key, column in _JSON_COLUMNS.items() if key in result}
+    return pd.DataFrame(columns).to_dict("records")
+
+
+def import_json_results(results_dir=RESULTS_DIR, path=RESULTS_STORE):
+    r"""Build the results store from the json files of earlier evaluations.
+
+    Files are expected at ``<results_dir>/<algorithm>/<dataset>/results_<evaluations>[...].json``,
+    a ``sf(<factor>)`` in the file name is read as the subsampling factor.
+
+    Returns:
+        pandas.DataFrame: The whole store.
+
+    """
+    for file in sorted(glob.glob(os.path.join(results_dir, "*", "*", "results_*.json"))):
+        algorithm, dataset = file.split(os.sep)[-3:-1]
+        factor = re.search(r"sf\(([\d.]+)\)", os.path.basename(file))
+        with open(file, "r") as f:
+            for result in json.load(f):
+                config = {
+                    "algorithm": algorithm,
+                    "dataset": dataset,
+                    "evaluations": result["evals"],
+                    "grouped": result["group"],
+                    "subsampling_factor": float(factor.group(1)) if factor else np.nan,
+                }
+                append_runs(runs_from_json(result), path, **config)
+
+    return load_runs(path)
@@ -0,0 +1,188 @@
+import os
+import json
+
+import numpy as np
+
+from niaarm.feature import Feature
+from niaarm.rule import Rule
+from niaarm.rule_list import RuleList
+
+from utils.Metrics import METRICS, Contingency, metric_table
+
+# Side of a rule an item belongs to
+ANTECEDENT = 0
+CONSEQUENT = 1
+
+_COLUMNS = ("offsets", "features", "sides", "lower", "upper", "category_ids", "counts", "metric_values")
+
+
+def _item(value):
+    # numpy scalars are not json serializable
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def save_rules(rules, path):
+    r"""Write rules to a columnar archive.
+
+    The archive is a directory holding one ``.npy`` file per column and a json header. Every item
+    (feature of a rule) is a row of the item columns: feature id, side of the rule, bounds and
+    category id. ``offsets`` delimits the items of every rule. Every rule also stores its contingency
+    counts and the value of every registered metric and of its fitness, with the values of a
+    metric stored contiguously.
+
+    Args:
+        rules (RuleList): Rules to write.
+        path (str): Directory of the archive, created if missing.
+
+    """
+    feature_ids = {}
+    dtypes = []
+    categories = []
+    category_ids = []
+
+    offsets = [0]
+    features = []
+    sides = []
+    lower = []
+    upper = []
+    item_categories = []
+
+    for rule in rules:
+        for side, items in ((ANTECEDENT, rule.antecedent), (CONSEQUENT, rule.consequent)):
+            for feature in items:
+                if feature.name not in feature_ids:
+                    feature_ids[feature.name] = len(feature_ids)
+                    dtypes.append(feature.dtype)
+                    categories.append([])
+                    category_ids.append({})
+                f = feature_ids[feature.name]
+                features.append(f)
+                sides.append(side)
+                if feature.dtype == "cat":
+                    category = _item(feature.categories[0])
+                    if category not in category_ids[f]:
+                        category_ids[f][category] = len(categories[f])
+                        categories[f].append(category)
+                    item_categories.append(category_ids[f][category])
+                    lower.append(np.nan)
+                    upper.append(np.nan)
+                else:
+                    item_categories.append(-1)
+                    lower.append(feature.min_val)
+                    upper.append(feature.max_val)
+        offsets.append(len(features))
+
+    metrics = list(METRICS) + ["fitness"]
+    table = metric_table(rules, metrics)
+    counts = Contingency.from_rules(rules)
+
+    columns = {
+        "offsets": np.array(offsets, dtype=np.int64),
+        "features": np.array(features, dtype=np.int32),
+        "sides": np.array(sides, dtype=np.int8),
+        "lower": np.array(lower, dtype=float),
+        "upper": np.array(upper, dtype=float),
+        "category_ids": np.array(item_categories, dtype=np.int32),
+        "counts": np.stack([counts.full, counts.antecedent, counts.consequent, counts.num_transactions], axis=1),
+        "metric_values": np.stack([table[metric] for metric in metrics]).reshape(len(metrics), len(rules)),
+    }
+
+    os.makedirs(path, exist_ok=True)
+    for name, column in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), column)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({
+            "feature_names": list(feature_ids),
+            "dtypes": dtypes,
+            "categories": categories,
+            "metrics": metrics,
+        }, f)
+
+
+class RuleArchive:
+    r"""Rules of an archive written by :func:`save_rules`, memory-mapped.
+
+    Metric values and items are read from the mapped columns as needed, :class:`niaarm.rule.Rule`
+    objects are only built when rules are accessed with ``archive[i]`` or :meth:`to_rule_list`.
+
+    Args:
+        path (str): Directory of the archive.
+
+    Attributes:
+        feature_names (list[str]): Name of every feature id.
+        dtypes (list[str]): Dtype of every feature id.
+        categories (list[list]): Categories of every feature id, indexed by category id.
+        metrics (list[str]): Metrics stored for every rule.
+
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        self.feature_names = meta["feature_names"]
+        self.dtypes = meta["dtypes"]
+        self.categories = meta["categories"]
+        self.metrics = meta["metrics"]
+        for name in _COLUMNS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def metric(self, name):
+        r"""Values of a stored metric for every rule."""
+        return self.metric_values[self.metrics.index(name)]
+
+    def items(self, i):
+        r"""Feature ids, sides, bounds and category ids of the items of rule ``i``."""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return (self.features[start:end], self.sides[start:end], self.lower[start:end], self.upper[start:end],
+                self.category_ids[start:end])
+
+    def _feature(self, f, lower, upper, category):
+        name = self.feature_names[f]
+        dtype = self.dtypes[f]
+        if dtype == "cat":
+            return Feature(name, dtype, categories=[self.categories[f][category]])
+        if dtype == "int":
+            return Feature(name, dtype, int(lower), int(upper))
+        return Feature(name, dtype, float(lower), float(upper))
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("rule index out of range")
+        i %= len(self)
+
+        antecedent = []
+        consequent = []
+        for f, side, lower, upper, category in zip(*self.items(i)):
+            feature = self._feature(f, lower, upper, category)
+            (antecedent if side == ANTECEDENT else consequent).append(feature)
+
+        full, antecedent_count, consequent_count, num_transactions = (np.int64(c) for c in self.counts[i])
+        rule = Rule(antecedent, consequent)
+        rule.num_transactions = num_transactions
+        rule.full_count = full
+        rule.antecedent_count = antecedent_count
+        rule.consequent_count = consequent_count
+        rule.ant_not_con = antecedent_count - full
+        rule.con_not_ant = consequent_count - full
+        rule.not_ant_not_con = num_transactions - antecedent_count - rule.con_not_ant
+        rule._Rule__inclusion = float(self.metric("inclusion")[i])
+        rule._Rule__amplitude = float(self.metric("amplitude")[i])
+        rule.fitness = float(self.metric("fitness")[i])
+        return rule
+
+    def to_rule_list(self):
+        r"""Build all rules."""
+        return RuleList(self[i] for i in range(len(self)))
+
+
+def load_rules(path):
+    r"""Open an archive written by :func:`save_rules` without reading it into memory.
+
+    Returns:
+        RuleArchive: The memory-mapped archive.
+
+    """
+    return RuleArchive(path)
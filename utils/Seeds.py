@@ -0,0 +1,60 @@
+from collections import namedtuple
+
+import numpy as np
+
+
+class RunStreams(namedtuple("RunStreams", ("subsample", "algorithm", "problem"))):
+    """Independent random streams of one run as a ``namedtuple`` of ``numpy.random.SeedSequence``.
+
+    Every stream can be passed wherever a seed is accepted, e.g. ``numpy.random.default_rng`` or the
+    ``seed`` of an algorithm.
+
+    Attributes:
+        subsample (numpy.random.SeedSequence): Selection of the groups to mine.
+        algorithm (numpy.random.SeedSequence): Initialization and iterations of the optimizer.
+        problem (numpy.random.SeedSequence): Row sample of the problem.
+
+    """
+
+    __slots__ = ()
+
+
+def seed_sequence(seed=None):
+    r"""Get a ``numpy.random.SeedSequence`` from a seed.
+
+    Args:
+        seed (Union[None, int, Sequence[int], numpy.random.SeedSequence]): A seed sequence is returned as is,
+         anything else is its entropy. Default: ``None``, fresh entropy from the operating system.
+
+    Returns:
+        numpy.random.SeedSequence: The seed sequence.
+
+    """
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+def spawn_runs(seed, num_runs):
+    r"""Seeds of independent runs, islands or workers, spawned from one seed.
+
+    Args:
+        seed (Union[None, int, Sequence[int], numpy.random.SeedSequence]): Root seed, see :func:`seed_sequence`.
+        num_runs (int): Number of seeds.
+
+    Returns:
+        list[numpy.random.SeedSequence]: A child seed sequence per run.
+
+    """
+    return seed_sequence(seed).spawn(num_runs)
+
+
+def run_streams(seed=None):
+    r"""Split the seed of a run into the streams of its random parts.
+
+    Args:
+        seed (Union[None, int, Sequence[int], numpy.random.SeedSequence]): Seed of the run, see :func:`seed_sequence`.
+
+    Returns:
+        RunStreams: Seed sequences of the subsampling, the algorithm and the problem.
+
+    """
+    return RunStreams(*seed_sequence(seed).spawn(len(RunStreams._fields)))
@@ -0,0 +1,157 @@
+import pickle
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from niaarm.feature import Feature
+
+from utils.Index import sort_column
+
+
+def _problem_dimension(features):
+    r"""Dimension of the optimization problem, computed as in :class:`niaarm.Dataset`."""
+    return len(features) + 1 + sum(3 if feature.dtype != "cat" else 2 for feature in features)
+
+
+class SharedDataset:
+    r"""Dataset whose transactions are zero-copy views of a shared memory block.
+
+    Provides the attributes of :class:`niaarm.Dataset` used by :func:`utils.Mine.get_rules`.
+
+    Attributes:
+        transactions (pandas.DataFrame): Transactional data.
+        header (list[str]): Feature names.
+        features (list[Feature]): List of features.
+        dimension (int): Dimension of the optimization problem for the dataset.
+        sorted_columns (dict[str, Tuple[numpy.ndarray, numpy.ndarray]]): Sort order and sorted values of every
+         column, see :func:`utils.Index.sort_column`, also views of the shared block.
+
+    """
+
+    def __init__(self, features, columns, shm, sorted_columns):
+        self.features = features
+        self.header = [feature.name for feature in features]
+        self.dimension = _problem_dimension(features)
+        self.transactions = pd.DataFrame(columns, columns=self.header, copy=False)
+        self.sorted_columns = sorted_columns
+        self._columns = columns
+        self._shm = shm
+
+    def select(self, names):
+        r"""Get a dataset restricted to the given features, still backed by the shared block.
+
+        Args:
+            names (Iterable[str]): Features to keep. Column order of the dataset is preserved.
+
+        Returns:
+            SharedDataset: The restricted dataset.
+
+        """
+        names = set(names)
+        features = [feature for feature in self.features if feature.name in names]
+        return SharedDataset(
+            features,
+            {feature.name: self._columns[feature.name] for feature in features},
+            self._shm,
+            {feature.name: self.sorted_columns[feature.name] for feature in features},
+        )
+
+
+class SharedTransactions:
+    r"""Encoded transaction columns and feature metadata in shared memory.
+
+    The owning process copies the transactions once into a single shared memory block,
+    numeric columns as they are and categorical columns as their integer codes, each
+    followed by its sort order and sorted values, so the transaction indexes of all
+    workers view one sorted copy. The feature metadata and column layout are pickled
+    into a second block named ``name``, which is all other processes need to :func:`attach`.
+
+    Args:
+        dataset (Dataset): Dataset to share.
+        name (Optional[str]): Name of the metadata block. Default: chosen by the system.
+
+    Attributes:
+        name (str): Name to pass to :func:`attach`.
+
+    """
+
+    def __init__(self, dataset, name=None):
+        arrays = []
+        for feature in dataset.features:
+            column = dataset.transactions[feature.name]
+            if feature.dtype == "cat":
+                values = np.ascontiguousarray(column.cat.codes.to_numpy())
+            else:
+                values = np.ascontiguousarray(column.to_numpy())
+            # values, sort order and sorted values of every column
+            arrays.extend((values, *sort_column(values)))
+
+        layout = []
+        offset = 0
+        for array in arrays:
+            # keep every column aligned for its dtype
+            offset += -offset % 8
+            layout.append((array.dtype.str, offset))
+            offset += array.nbytes
+
+        self._data = SharedMemory(create=True, size=max(offset, 1))
+        for array, (dtype, offset) in zip(arrays, layout):
+            np.ndarray(array.shape, dtype=dtype, buffer=self._data.buf, offset=offset)[:] = array
+
+        features = [(f.name, f.dtype, f.min_val, f.max_val, f.categories) for f in dataset.features]
+        meta = pickle.dumps({
+            "data": self._data.name,
+            "num_transactions": len(dataset.transactions),
+            "features": features,
+            "layout": layout,
+        })
+        self._meta = SharedMemory(name=name, create=True, size=len(meta))
+        self._meta.buf[:len(meta)] = meta
+        self.name = self._meta.name
+
+    def close(self):
+        r"""Release the shared memory blocks, attached datasets must not be used afterwards."""
+        for shm in (self._meta, self._data):
+            shm.close()
+            shm.unlink()
+
+
+def attach(name):
+    r"""Attach to transactions shared by :class:`SharedTransactions` without copying them.
+
+    Meant for worker processes started by the owning process, which share its resource
+    tracker, so the blocks are unlinked once, by :meth:`SharedTransactions.close`.
+
+    Args:
+        name (str): Name of the shared transactions.
+
+    Returns:
+        SharedDataset: Dataset backed by the shared memory block.
+
+    """
+    meta_shm = SharedMemory(name=name)
+    meta = pickle.loads(bytes(meta_shm.buf))
+    meta_shm.close()
+
+    shm = SharedMemory(name=meta["data"])
+    num_transactions = meta["num_transactions"]
+    arrays = []
+    for array_dtype, offset in meta["layout"]:
+        array = np.ndarray((num_transactions,), dtype=array_dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays.append(array)
+
+    features = []
+    columns = {}
+    sorted_columns = {}
+    for k, (feature_name, dtype, min_val, max_val, categories) in enumerate(meta["features"]):
+        values, order, sorted_values = arrays[3 * k:3 * k + 3]
+        if dtype == "cat":
+            columns[feature_name] = pd.Categorical.from_codes(values, categories)
+        else:
+            columns[feature_name] = values
+        sorted_columns[feature_name] = (order, sorted_values)
+        features.append(Feature(feature_name, dtype, min_val, max_val, categories))
+
+    return SharedDataset(features, columns, shm, sorted_columns)
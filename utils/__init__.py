@@ -0,0 +1,26 @@
+import importlib.util
+import sys
+
+
+def _defer_niaarm_init():
+    # niaarm/__init__ imports niaarm.mine and with it niaarm.text, nltk and scipy, for every user of
+    # niaarm.rule or niaarm.dataset. The package is registered without running its __init__, so only
+    # the submodules imported by name are loaded. The first other attribute looked up on the package
+    # runs the __init__, e.g. niaarm.get_rules or ``from niaarm import Dataset``.
+    if "niaarm" in sys.modules:
+        return
+    spec = importlib.util.find_spec("niaarm")
+    if spec is None:
+        return
+    package = importlib.util.module_from_spec(spec)
+
+    def load(name):
+        del package.__getattr__
+        spec.loader.exec_module(package)
+        return getattr(package, name)
+
+    package.__getattr__ = load
+    sys.modules["niaarm"] = package
+
+
+_defer_niaarm_init()